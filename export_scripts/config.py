@@ -0,0 +1,42 @@
+"""
+Shared configuration for the export scripts.
+"""
+
+# Tilesets that reuse another tileset's graphics in the original game
+TILESET_ALIASES = {
+    5: 7,  # DOJO -> GYM (uses same graphics)
+    2: 6,  # MART -> POKECENTER (similar interior graphics)
+}
+
+# Source tileset -> tilesets that alias it, e.g. GYM -> (DOJO,)
+REVERSE_TILESET_ALIASES = {}
+for alias_id, source_id in TILESET_ALIASES.items():
+    REVERSE_TILESET_ALIASES.setdefault(source_id, []).append(alias_id)
+REVERSE_TILESET_ALIASES = {
+    source_id: tuple(alias_ids)
+    for source_id, alias_ids in REVERSE_TILESET_ALIASES.items()
+}
+
+
+def get_tileset_alias(tileset_id):
+    """Return the tileset whose graphics should be used for tileset_id"""
+    return TILESET_ALIASES.get(tileset_id, tileset_id)
+
+
+def get_reverse_aliases(tileset_id):
+    """Return the tilesets that borrow their graphics from tileset_id"""
+    return REVERSE_TILESET_ALIASES.get(tileset_id, ())
+
+
+def tune_bulk_load(conn, cache_size_kib=None):
+    """Configure a pokemon.db connection for rebuilding tables from source
+
+    Every exporter regenerates its tables from the source files, so durability
+    is traded for speed. All of them share the file and use WAL, so it keeps
+    one journal mode from script to script.
+    """
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    if cache_size_kib is not None:
+        conn.execute(f"PRAGMA cache_size=-{cache_size_kib}")
@@ -14,15 +14,21 @@ Usage:
 """
 
 import os
+import shutil
 import sqlite3
 import binascii
+import numpy as np
 from PIL import Image
 from pathlib import Path
 import sys
 import time
 import hashlib
-import io
 import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby, repeat
+from operator import itemgetter
+
+from config import get_tileset_alias, get_reverse_aliases, tune_bulk_load
 
 # Constants
 # Get the project root directory (parent of the script's directory)
@@ -31,12 +37,21 @@ DB_PATH = PROJECT_ROOT / "pokemon.db"
 TILE_IMAGES_DIR = "tile_images"
 BATCH_SIZE = 1000  # Number of tiles to insert in a single batch
 
+# Offsets of the 4 tiles of a block (top-left, top-right, bottom-left, bottom-right)
+POSITION_X_OFFSETS = np.array([0, 1, 0, 1])
+POSITION_Y_OFFSETS = np.array([0, 0, 1, 1])
+
 
 def create_new_tables():
     """Create new tiles and tile_images tables in the database"""
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
+    # Keep pages hot for the read-heavy tiles_raw scan: use a ~500 MB page
+    # cache and read through a 1 GB memory map
+    tune_bulk_load(conn, cache_size_kib=500000)
+    cursor.execute("PRAGMA mmap_size=1073741824")
+
     # Drop existing tables if they exist
     cursor.execute("DROP TABLE IF EXISTS tiles")
     cursor.execute("DROP TABLE IF EXISTS tile_images")
@@ -68,7 +83,6 @@ def create_new_tables():
         tileset_id INTEGER NOT NULL,
         block_index INTEGER NOT NULL,
         position INTEGER NOT NULL,  -- 0: top-left, 1: top-right, 2: bottom-left, 3: bottom-right
-        image_path TEXT NOT NULL,
         image_hash TEXT NOT NULL,
         FOREIGN KEY (tileset_id) REFERENCES tilesets (id)
     )
@@ -76,10 +90,7 @@ def create_new_tables():
     )
 
     # Create indexes for better performance
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tiles_map_id ON tiles (map_id)")
-    cursor.execute(
-        "CREATE INDEX IF NOT EXISTS idx_tiles_tile_image_id ON tiles (tile_image_id)"
-    )
+    create_tiles_indexes(cursor)
     cursor.execute(
         "CREATE INDEX IF NOT EXISTS idx_tile_images_tileset_id ON tile_images (tileset_id)"
     )
@@ -91,63 +102,142 @@ def create_new_tables():
     return conn
 
 
-def decode_2bpp_tile(tile_data):
-    """Decode a 2bpp tile into a 2D array of pixel values (0-3)
+def create_tiles_indexes(cursor):
+    """Create the indexes on the tiles table"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tiles_map_id ON tiles (map_id)")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tiles_tile_image_id ON tiles (tile_image_id)"
+    )
+
+
+def drop_tiles_indexes(cursor):
+    """Drop the indexes on the tiles table"""
+    cursor.execute("DROP INDEX IF EXISTS idx_tiles_map_id")
+    cursor.execute("DROP INDEX IF EXISTS idx_tiles_tile_image_id")
 
-    Each tile is 8x8 pixels, with 2 bits per pixel.
-    Pixels are spread across neighboring bytes.
+
+def decode_2bpp_tiles(tiles_data):
+    """Decode consecutive 16-byte 2bpp tiles into an (n, 8, 8) array of pixel values"""
+    # 16 bytes per tile -> 8 rows of (low byte, high byte)
+    rows = np.frombuffer(tiles_data, dtype=np.uint8).reshape(-1, 8, 2)
+
+    # Unpack each byte MSB-first into its 8 bit planes: shape (n, 8, 2, 8)
+    bits = np.unpackbits(rows, axis=2).reshape(-1, 8, 2, 8)
+
+    # Combine the bits to get the pixel value (0-3)
+    return (bits[:, :, 1] << 1) | bits[:, :, 0]
+
+
+def get_image_hash(pixel_bytes):
+    """Generate a hash for an image's raw pixel bytes to identify duplicates
+
+    The hash is only used for deduplication within a run, so a short
+    non-cryptographic-strength digest is enough.
     """
-    pixels = []
+    return hashlib.blake2b(pixel_bytes, digest_size=8).digest()
+
+
+def get_tile_image_path(image_id):
+    """Get the path of the PNG file for a tile_images row
+
+    The path isn't stored in the database; tile image N is saved as
+    tile_{N - 1}.png, which is also what the server expects.
+    """
+    return f"{TILE_IMAGES_DIR}/tile_{image_id - 1}.png"
+
+
+def insert_tile_images(cursor, rows):
+    """Insert a batch of (id, tileset_id, block_index, position, image_hash) rows"""
+    cursor.executemany(
+        """
+    INSERT INTO tile_images (id, tileset_id, block_index, position, image_hash)
+    VALUES (?, ?, ?, ?, ?)
+    """,
+        rows,
+    )
 
-    # Process 16 bytes (8 rows of 2 bytes each)
-    for row in range(8):
-        row_pixels = []
-        # Each row is represented by 2 bytes
-        byte1 = tile_data[row * 2]
-        byte2 = tile_data[row * 2 + 1]
 
-        # Process each bit in the bytes
-        for bit in range(8):
-            # Extract the bit from each byte (from MSB to LSB)
-            bit_pos = 7 - bit
-            bit1 = (byte1 >> bit_pos) & 1
-            bit2 = (byte2 >> bit_pos) & 1
+def build_tileset_images(blocks, tiles):
+    """Build the 16x16 pixel buffers for every block position in a tileset
 
-            # Combine the bits to get the pixel value (0-3)
-            pixel_value = (bit2 << 1) | bit1
-            row_pixels.append(pixel_value)
+    Runs in a worker process. Returns a list of
+    (block_index, position, pixel_bytes, image_hash) tuples in block order,
+    where pixel_bytes holds one palette index (0-3) per pixel.
+    """
+    # Decode all tiles at once; the same tile is shared by many blocks.
+    # Only the first 16 bytes of each tile are used, and tiles too short to
+    # hold a whole 8x8 tile are skipped, so one bad blob can't shift the rest
+    tile_indexes = [
+        tile_index
+        for tile_index, tile_data in tiles.items()
+        if tile_data and len(tile_data) >= 16
+    ]
+    decoded_tiles = dict(
+        zip(
+            tile_indexes,
+            decode_2bpp_tiles(
+                b"".join(tiles[tile_index][:16] for tile_index in tile_indexes)
+            ),
+        )
+    )
 
-        pixels.append(row_pixels)
+    tileset_images = []
+
+    # Process each block to create 16x16 pixel images (4 per block)
+    for block_index, block_data in blocks.items():
+        # Each block is 4x4 tiles and yields 4 positions of 2x2 tiles:
+        # top-left (tiles 0,1,4,5), top-right (2,3,6,7),
+        # bottom-left (8,9,12,13) and bottom-right (10,11,14,15)
+        for pos_index in range(4):
+            # Create a new 16x16 buffer of palette indices (0 = white)
+            buf = np.zeros((16, 16), dtype=np.uint8)
+
+            # Process each of the 4 tiles in this position
+            for i in range(4):
+                # Calculate the position in the block data
+                y = (pos_index >> 1) * 2 + (i >> 1)
+                x = (pos_index & 1) * 2 + (i & 1)
+                tile_pos = y * 4 + x
+
+                # Get the tile index from the block data
+                if tile_pos < len(block_data):
+                    tile_index = block_data[tile_pos]
+                else:
+                    continue
+
+                # Get the decoded tile pixels
+                tile_pixels = decoded_tiles.get(tile_index)
+                if tile_pixels is None:
+                    continue
 
-    return pixels
+                # Calculate where to place this tile in the 16x16 image
+                offset_x = (i % 2) * 8  # 0 for left tiles, 8 for right tiles
+                offset_y = (i // 2) * 8  # 0 for top tiles, 8 for bottom tiles
 
+                # Copy the tile into its quadrant of the buffer
+                buf[offset_y : offset_y + 8, offset_x : offset_x + 8] = tile_pixels
 
-def get_image_hash(img):
-    """Generate a hash for an image to identify duplicates"""
-    img_bytes = io.BytesIO()
-    img.save(img_bytes, format="PNG")
-    return hashlib.md5(img_bytes.getvalue()).hexdigest()
+            # Generate hash for the raw pixel data
+            pixel_bytes = buf.tobytes()
+            tileset_images.append(
+                (block_index, pos_index, pixel_bytes, get_image_hash(pixel_bytes))
+            )
+
+    return tileset_images
 
 
 def extract_tile_images(conn):
     """Extract 16x16 pixel tile images from the blocksets and tilesets"""
     cursor = conn.cursor()
 
-    # Create directory for tile images if it doesn't exist
-    os.makedirs(TILE_IMAGES_DIR, exist_ok=True)
-
-    # Clean up old files
+    # Clean up old files by removing the whole directory, then recreate it
     print("Cleaning up old tile images...")
-    old_files = list(Path(TILE_IMAGES_DIR).glob("*.png"))
-    for old_file in old_files:
-        try:
-            os.remove(old_file)
-        except Exception as e:
-            print(f"Error removing {old_file}: {e}")
-    print(f"Removed {len(old_files)} old tile images")
+    shutil.rmtree(TILE_IMAGES_DIR, ignore_errors=True)
+    os.makedirs(TILE_IMAGES_DIR, exist_ok=True)
 
-    # Define GameBoy color palette (white, light gray, dark gray, black)
-    palette = [(255, 255, 255), (192, 192, 192), (96, 96, 96), (0, 0, 0)]
+    # Define GameBoy color palette (white, light gray, dark gray, black),
+    # flattened for PIL and padded out to the full 256-entry palette
+    palette = [255, 255, 255, 192, 192, 192, 96, 96, 96, 0, 0, 0] * 64
 
     # Get all tilesets
     cursor.execute("SELECT id, name FROM tilesets")
@@ -167,157 +257,117 @@ def extract_tile_images(conn):
     # Dictionary to map (tileset_id, block_index, position) to tile_image_id
     block_pos_to_image_id = {}
 
-    for i, (tileset_id, tileset_name) in enumerate(tilesets, 1):
-        # Update progress
-        sys.stdout.write(f"\rProcessing tileset {i}/{total_tilesets}: {tileset_name}")
-        sys.stdout.flush()
-
-        # Special case: Map DOJO (tileset ID 5) to GYM (tileset ID 7)
-        # This is because in the original game, DOJO uses the same graphics as GYM
-        query_tileset_id = 7 if tileset_id == 5 else tileset_id
-        # Special case: Map MART (tileset ID 2) to POKECENTER (tileset ID 6)
-        # This is because marts and pokecenters share similar interior graphics
-        if tileset_id == 2:
-            query_tileset_id = 6
-
-        # Get blockset data for this tileset
-        cursor.execute(
-            """
-        SELECT block_index, block_data 
-        FROM blocksets 
-        WHERE tileset_id = ? 
-        ORDER BY block_index
-        """,
-            (query_tileset_id,),
-        )
+    # Assign image IDs ourselves so rows can be inserted in batches
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM tile_images")
+    next_image_id = cursor.fetchone()[0] + 1
+    pending_images = []
 
-        blockset_rows = cursor.fetchall()
+    # Read the blockset and tile data for all tilesets up front
+    cursor.execute(
+        """
+    SELECT tileset_id, block_index, block_data
+    FROM blocksets
+    ORDER BY tileset_id, block_index
+    """
+    )
+    blocks_by_tileset = {
+        tileset_id: {block_index: block_data for _, block_index, block_data in rows}
+        for tileset_id, rows in groupby(cursor, key=itemgetter(0))
+    }
 
-        if not blockset_rows:
+    cursor.execute(
+        """
+    SELECT tileset_id, tile_index, tile_data
+    FROM tileset_tiles
+    ORDER BY tileset_id, tile_index
+    """
+    )
+    tiles_by_tileset = {
+        tileset_id: {tile_index: tile_data for _, tile_index, tile_data in rows}
+        for tileset_id, rows in groupby(cursor, key=itemgetter(0))
+    }
+
+    tileset_jobs = []
+    for tileset_id, tileset_name in tilesets:
+        # Some tilesets reuse another tileset's graphics (DOJO -> GYM, MART -> POKECENTER)
+        query_tileset_id = get_tileset_alias(tileset_id)
+
+        blocks = blocks_by_tileset.get(query_tileset_id)
+        tiles = tiles_by_tileset.get(query_tileset_id)
+        if not blocks or not tiles:
             continue
 
-        # Get tileset tiles
-        cursor.execute(
-            """
-        SELECT tile_index, tile_data 
-        FROM tileset_tiles 
-        WHERE tileset_id = ? 
-        ORDER BY tile_index
-        """,
-            (query_tileset_id,),
-        )
+        tileset_jobs.append((tileset_id, tileset_name, blocks, tiles))
 
-        tile_rows = cursor.fetchall()
+    # Insert all tile images in a single transaction
+    cursor.execute("BEGIN")
 
-        if not tile_rows:
-            continue
+    # Build the pixel data for each tileset in parallel; deduplication, saving
+    # and inserting stay in this process since SQLite has a single writer
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(
+            build_tileset_images,
+            [blocks for _, _, blocks, _ in tileset_jobs],
+            [tiles for _, _, _, tiles in tileset_jobs],
+        )
 
-        # Create dictionaries for easy lookup
-        blocks = {row[0]: row[1] for row in blockset_rows}
-        tiles = {row[0]: row[1] for row in tile_rows}
-
-        # Process each block to create 16x16 pixel images (4 per block)
-        for block_index, block_data in blocks.items():
-            # Define the 4 positions in the block (each position is 2x2 tiles)
-            positions = [
-                # Top-left: tiles at positions 0,1,4,5
-                [(0, 0), (0, 1), (1, 0), (1, 1)],
-                # Top-right: tiles at positions 2,3,6,7
-                [(0, 2), (0, 3), (1, 2), (1, 3)],
-                # Bottom-left: tiles at positions 8,9,12,13
-                [(2, 0), (2, 1), (3, 0), (3, 1)],
-                # Bottom-right: tiles at positions 10,11,14,15
-                [(2, 2), (2, 3), (3, 2), (3, 3)],
-            ]
-
-            for pos_index, position in enumerate(positions):
-                # Create a new 16x16 image
-                img = Image.new("RGB", (16, 16), color=(255, 255, 255))
-
-                # Process each of the 4 tiles in this position
-                for i, (y, x) in enumerate(position):
-                    # Calculate the position in the block data
-                    tile_pos = y * 4 + x
-
-                    # Get the tile index from the block data
-                    if tile_pos < len(block_data):
-                        tile_index = block_data[tile_pos]
-                    else:
-                        continue
-
-                    # Get the tile data
-                    tile_data = tiles.get(tile_index)
-                    if not tile_data:
-                        continue
-
-                    # Decode the tile data
-                    tile_pixels = decode_2bpp_tile(tile_data)
-
-                    # Calculate where to place this tile in the 16x16 image
-                    offset_x = (i % 2) * 8  # 0 for left tiles, 8 for right tiles
-                    offset_y = (i // 2) * 8  # 0 for top tiles, 8 for bottom tiles
-
-                    # Draw the tile
-                    for py in range(8):
-                        for px in range(8):
-                            pixel_value = tile_pixels[py][px]
-                            pixel_color = palette[pixel_value]
-                            img.putpixel((offset_x + px, offset_y + py), pixel_color)
-
-                # Generate hash for the image
-                img_hash = get_image_hash(img)
+        for i, ((tileset_id, tileset_name, _, _), tileset_images) in enumerate(
+            zip(tileset_jobs, results), 1
+        ):
+            # Update progress
+            sys.stdout.write(
+                f"\rProcessing tileset {i}/{len(tileset_jobs)}: {tileset_name}"
+            )
+            sys.stdout.flush()
 
+            for block_index, pos_index, pixel_bytes, img_hash in tileset_images:
                 # Check if we've already seen this image
                 if img_hash in image_hash_to_id:
                     # Use the existing image ID
-                    existing_image_id = image_hash_to_id[img_hash]
-                    block_pos_to_image_id[(tileset_id, block_index, pos_index)] = (
-                        existing_image_id
-                    )
-                    # Special case: If this is the GYM tileset (ID 7), also store the mapping for DOJO (ID 5)
-                    if tileset_id == 7:
-                        block_pos_to_image_id[(5, block_index, pos_index)] = (
-                            existing_image_id
-                        )
-                    # Special case: If this is the POKECENTER tileset (ID 6), also store the mapping for MART (ID 2)
-                    if tileset_id == 6:
-                        block_pos_to_image_id[(2, block_index, pos_index)] = (
-                            existing_image_id
-                        )
+                    image_id = image_hash_to_id[img_hash]
                     duplicate_count += 1
                 else:
-                    # Save the image with a sequential number
-                    image_path = f"{TILE_IMAGES_DIR}/tile_{unique_image_count}.png"
-                    img.save(image_path)
-
-                    # Insert the new image record
-                    cursor.execute(
-                        """
-                    INSERT INTO tile_images (tileset_id, block_index, position, image_path, image_hash)
-                    VALUES (?, ?, ?, ?, ?)
-                    """,
-                        (tileset_id, block_index, pos_index, image_path, img_hash),
+                    image_id = next_image_id
+                    next_image_id += 1
+
+                    # Build a palette-indexed image from the buffer and save it
+                    # under its image ID (only needed for new images)
+                    img = Image.frombuffer("P", (16, 16), pixel_bytes, "raw", "P", 0, 1)
+                    img.putpalette(palette)
+                    img.save(get_tile_image_path(image_id), compress_level=1)
+
+                    # Queue the new image record
+                    pending_images.append(
+                        (
+                            image_id,
+                            tileset_id,
+                            block_index,
+                            pos_index,
+                            img_hash.hex(),
+                        )
                     )
+                    if len(pending_images) >= BATCH_SIZE:
+                        insert_tile_images(cursor, pending_images)
+                        pending_images = []
 
-                    # Get the new image ID
-                    image_id = cursor.lastrowid
                     image_hash_to_id[img_hash] = image_id
-                    block_pos_to_image_id[(tileset_id, block_index, pos_index)] = (
-                        image_id
-                    )
-                    # Special case: If this is the GYM tileset (ID 7), also store the mapping for DOJO (ID 5)
-                    if tileset_id == 7:
-                        block_pos_to_image_id[(5, block_index, pos_index)] = image_id
-                    # Special case: If this is the POKECENTER tileset (ID 6), also store the mapping for MART (ID 2)
-                    if tileset_id == 6:
-                        block_pos_to_image_id[(2, block_index, pos_index)] = image_id
                     unique_image_count += 1
 
+                # Store the mapping for this tileset and any tilesets that
+                # borrow its graphics (e.g. GYM also provides DOJO)
+                for mapped_tileset_id in (
+                    tileset_id,
+                    *get_reverse_aliases(tileset_id),
+                ):
+                    block_pos_to_image_id[
+                        (mapped_tileset_id, block_index, pos_index)
+                    ] = image_id
+
                 tile_image_count += 1
 
-                # Commit periodically
-                if unique_image_count % BATCH_SIZE == 0:
-                    conn.commit()
+    # Insert any remaining images
+    if pending_images:
+        insert_tile_images(cursor, pending_images)
 
     conn.commit()
     elapsed_time = time.time() - start_time
@@ -329,6 +379,29 @@ def extract_tile_images(conn):
     return block_pos_to_image_id
 
 
+def build_image_id_table(block_pos_to_image_id):
+    """Convert the (tileset_id, block_index, position) -> tile_image_id mapping
+    into a dense array indexed the same way, with 0 where there is no image"""
+    if not block_pos_to_image_id:
+        return np.zeros((0, 0, 4), dtype=np.int32)
+
+    keys = np.array(list(block_pos_to_image_id.keys()))
+    table = np.zeros((keys[:, 0].max() + 1, keys[:, 1].max() + 1, 4), dtype=np.int32)
+    table[keys[:, 0], keys[:, 1], keys[:, 2]] = list(block_pos_to_image_id.values())
+    return table
+
+
+def insert_tiles(cursor, rows):
+    """Insert a batch of rows into the tiles table"""
+    cursor.executemany(
+        """
+    INSERT INTO tiles (x, y, local_x, local_y, map_id, tile_image_id, is_overworld, is_walkable)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+        rows,
+    )
+
+
 def populate_tiles(conn, block_pos_to_image_id):
     """Populate the tiles table based on the tiles_raw and maps tables"""
     cursor = conn.cursor()
@@ -359,27 +432,18 @@ def populate_tiles(conn, block_pos_to_image_id):
             "Warning: collision_tiles table does not exist. Walkability data may be inaccurate."
         )
 
-    # Get all maps with their is_overworld flag
-    cursor.execute(
-        """
-    SELECT id, name, width, height, tileset_id, is_overworld
-    FROM maps
-    """
-    )
+    # Dense (tileset_id, block_index, position) -> tile_image_id table
+    image_id_table = build_image_id_table(block_pos_to_image_id)
 
-    maps = cursor.fetchall()
-    total_maps = len(maps)
+    # Get the number of maps for progress reporting
+    cursor.execute("SELECT COUNT(*) FROM maps")
+    total_maps = cursor.fetchone()[0]
 
     print(f"Processing {total_maps} maps...")
     tile_count = 0
     processed_maps = 0
-    skipped_maps = 0
-    skipped_map_names = []
     start_time = time.time()
 
-    # Prepare for batch insert
-    tiles_data = []
-
     # Get the overworld map positions if available
     cursor.execute(
         "SELECT name FROM sqlite_master WHERE type='table' AND name='overworld_map_positions'"
@@ -388,69 +452,57 @@ def populate_tiles(conn, block_pos_to_image_id):
 
     map_positions = {}
     if has_positions_table:
-        cursor.execute(
-            "SELECT map_name, x_offset, y_offset FROM overworld_map_positions"
-        )
-        for map_name, x_offset, y_offset in cursor.fetchall():
-            map_positions[map_name] = (x_offset, y_offset)
-
-    # Process each map
-    for i, (
-        map_id,
-        map_name,
-        width,
-        height,
-        tileset_id,
-        is_overworld,
-    ) in enumerate(maps, 1):
+        map_positions = {
+            map_name: (x_offset, y_offset)
+            for map_name, x_offset, y_offset in cursor.execute(
+                "SELECT map_name, x_offset, y_offset FROM overworld_map_positions"
+            )
+        }
+
+    # Drop the tiles indexes during the bulk insert; building them once at the
+    # end is cheaper than updating them for every row
+    drop_tiles_indexes(cursor)
+
+    # Stream the raw tile data for all maps in a single query, grouped by map
+    raw_cursor = conn.cursor()
+    raw_cursor.execute(
+        """
+    SELECT tr.x, tr.y, tr.block_index, tr.tileset_id, tr.is_walkable,
+           m.id, m.name, m.is_overworld
+    FROM tiles_raw tr
+    JOIN maps m ON m.id = tr.map_id
+    ORDER BY m.id, tr.y DESC, tr.x
+    """
+    )
+
+    for map_id, map_rows in groupby(raw_cursor, key=itemgetter(5)):
+        map_rows = list(map_rows)
+        map_name, is_overworld = map_rows[0][6], map_rows[0][7]
+        processed_maps += 1
+
         # Update progress every 5 maps
-        if i % 5 == 0 or i == total_maps:
+        if processed_maps % 5 == 0:
             sys.stdout.write(
-                f"\rProcessed {i}/{total_maps} maps, created {tile_count} tiles"
+                f"\rProcessed {processed_maps}/{total_maps} maps, created {tile_count} tiles"
             )
             sys.stdout.flush()
 
-        processed_maps += 1
-
         # Get position offsets for this map if it's an overworld map
         x_offset, y_offset = 0, 0
         if is_overworld and map_name in map_positions:
             x_offset, y_offset = map_positions[map_name]
 
-        # Get raw tile data for this map from tiles_raw table
-        cursor.execute(
-            """
-        SELECT x, y, block_index, tileset_id, is_overworld, is_walkable
-        FROM tiles_raw
-        WHERE map_id = ?
-        """,
-            (map_id,),
-        )
-
-        raw_tiles = cursor.fetchall()
-
-        if not raw_tiles:
-            continue
-
-        # Collect tiles for this map
-        map_tiles = []
+        # Collect per-block columns for the blocks of this map
+        block_xs = []
+        block_ys = []
+        block_tileset_ids = []
+        block_indexes = []
+        block_walkable = []
 
         # Process each raw tile
-        for (
-            raw_x,
-            raw_y,
-            block_index,
-            raw_tileset_id,
-            raw_is_overworld,
-            raw_is_walkable,
-        ) in raw_tiles:
-            # Special case: Map DOJO (tileset ID 5) to GYM (tileset ID 7)
-            # This is because in the original game, DOJO uses the same graphics as GYM
-            lookup_tileset_id = 7 if raw_tileset_id == 5 else raw_tileset_id
-            # Special case: Map MART (tileset ID 2) to POKECENTER (tileset ID 6)
-            # This is because marts and pokecenters share similar interior graphics
-            if raw_tileset_id == 2:
-                lookup_tileset_id = 6
+        for raw_x, raw_y, block_index, raw_tileset_id, raw_is_walkable, *_ in map_rows:
+            # Some tilesets reuse another tileset's graphics (DOJO -> GYM, MART -> POKECENTER)
+            lookup_tileset_id = get_tileset_alias(raw_tileset_id)
 
             # Get the block data to check individual tiles
             cursor.execute(
@@ -492,73 +544,76 @@ def populate_tiles(conn, block_pos_to_image_id):
                         is_walkable = 0
                         break
 
-            # Each block corresponds to 4 tiles (2x2 grid)
-            # We need to create 4 entries in the tiles table
-            for position in range(4):
-                # Calculate the actual x, y coordinates for this tile
-                # Each block is 2x2 tiles, so we need to multiply by 2
-                tile_x = raw_x * 2 + (position % 2) + x_offset
-                tile_y = raw_y * 2 + (position // 2)
-
-                # Add y_offset if applicable (for maps with position data)
-                if map_name in map_positions:
-                    tile_y += y_offset
-
-                # Get the tile_image_id from our dictionary
-                tile_image_id = block_pos_to_image_id.get(
-                    (lookup_tileset_id, block_index, position)
-                )
-                if not tile_image_id:
-                    # Try with a default position if specific position not found
-                    tile_image_id = block_pos_to_image_id.get(
-                        (lookup_tileset_id, block_index, 0)
-                    )
-                    if not tile_image_id:
-                        continue
-
-                # Add to map tiles
-                map_tiles.append(
-                    (
-                        tile_x,
-                        tile_y,
-                        tile_x,
-                        tile_y,
-                        map_id,
-                        tile_image_id,
-                        is_overworld,
-                        is_walkable,  # Use the updated walkable value
-                    )
-                )
-
-        # Sort map tiles by y-coordinate in descending order (top to bottom becomes bottom to top)
-        map_tiles.sort(key=lambda t: (-t[1], t[0]))
+            block_tileset_ids.append(lookup_tileset_id)
+            block_indexes.append(block_index)
+            block_xs.append(raw_x)
+            block_ys.append(raw_y)
+            block_walkable.append(is_walkable)
 
-        # Add to batch insert data
-        tiles_data.extend(map_tiles)
-        tile_count += len(map_tiles)
+        if not block_xs:
+            continue
 
-        # Execute batch insert if we've reached the batch size
-        if len(tiles_data) >= BATCH_SIZE:
-            cursor.executemany(
-                """
-            INSERT INTO tiles (x, y, local_x, local_y, map_id, tile_image_id, is_overworld, is_walkable)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                tiles_data,
-            )
-            conn.commit()
-            tiles_data = []
-
-    # Insert any remaining tiles
-    if tiles_data:
-        cursor.executemany(
-            """
-        INSERT INTO tiles (x, y, local_x, local_y, map_id, tile_image_id, is_overworld, is_walkable)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            tiles_data,
+        # Each block corresponds to 4 tiles (2x2 grid), so expand every block
+        # column into 4 tile entries. Each block is 2x2 tiles, so we need to
+        # multiply the block coordinates by 2
+        block_count = len(block_xs)
+        tile_xs = (
+            np.repeat(np.array(block_xs) * 2, 4)
+            + np.tile(POSITION_X_OFFSETS, block_count)
+            + x_offset
+        )
+        tile_ys = (
+            np.repeat(np.array(block_ys) * 2, 4)
+            + np.tile(POSITION_Y_OFFSETS, block_count)
+            + y_offset
+        )
+        # Look up the tile_image_id of each of the block's 4 tiles in one
+        # gather, falling back to position 0 (0 means no image)
+        block_tileset_ids = np.array(block_tileset_ids)
+        block_indexes = np.array(block_indexes)
+        in_table = (block_tileset_ids < image_id_table.shape[0]) & (
+            block_indexes < image_id_table.shape[1]
         )
-        conn.commit()
+        block_image_ids = np.zeros((block_count, 4), dtype=image_id_table.dtype)
+        block_image_ids[in_table] = image_id_table[
+            block_tileset_ids[in_table], block_indexes[in_table]
+        ]
+        block_image_ids = np.where(
+            block_image_ids == 0, block_image_ids[:, :1], block_image_ids
+        )
+        tile_image_ids = block_image_ids.ravel()
+        tile_walkable = np.repeat(block_walkable, 4)
+
+        # Skip tiles without an image, and sort the rest by y-coordinate in
+        # descending order (top to bottom becomes bottom to top), then by x
+        kept = np.flatnonzero(tile_image_ids)
+        order = kept[np.lexsort((tile_xs[kept], -tile_ys[kept]))]
+
+        tile_xs = tile_xs[order].tolist()
+        tile_ys = tile_ys[order].tolist()
+        insert_tiles(
+            cursor,
+            zip(
+                tile_xs,
+                tile_ys,
+                tile_xs,
+                tile_ys,
+                repeat(map_id),
+                tile_image_ids[order].tolist(),
+                repeat(is_overworld),
+                tile_walkable[order].tolist(),  # Use the updated walkable value
+            ),
+        )
+        tile_count += len(order)
+
+    # Recreate the tiles indexes now that the table is filled
+    create_tiles_indexes(cursor)
+    conn.commit()
+
+    sys.stdout.write(
+        f"\rProcessed {processed_maps}/{total_maps} maps, created {tile_count} tiles"
+    )
+    sys.stdout.flush()
 
     elapsed_time = time.time() - start_time
     print(
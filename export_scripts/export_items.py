@@ -2,8 +2,11 @@
 import os
 import re
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from config import tune_bulk_load
+
 # Constants
 BASE_DIR = Path(
     __file__
@@ -12,19 +15,44 @@ POKEMON_DATA_DIR = BASE_DIR / "pokemon-game-data/data/items"
 CONSTANTS_DIR = BASE_DIR / "pokemon-game-data/constants"
 MOVES_DATA_DIR = BASE_DIR / "pokemon-game-data/data/moves"
 
+# Some moves have special constant names, like PSYCHIC_M instead of PSYCHIC
+MOVE_NAME_SPECIAL_CASES = {
+    "PSYCHIC": "PSYCHIC_M",
+}
+
+# Items are inserted several rows per statement, one placeholder group per row
+INSERT_ITEMS_SQL = """
+INSERT INTO items (
+    id, name, short_name, price, is_usable, uses_party_menu,
+    vending_price, move_id, is_guard_drink, is_key_item
+) VALUES """
+ITEM_ROW_PLACEHOLDERS = "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+# Stay under SQLite's default limit of 999 bound parameters per statement
+ROWS_PER_INSERT = 999 // 10
+
+# Regular expressions
+# Patterns match raw file bytes, so only the captured groups need decoding
+# Item constants, TM moves and HM moves in item_constants.asm, matched in one pass
+ITEM_CONSTANTS_FILE_PATTERN = re.compile(
+    rb"const\s+(\w+)\s*;\s*\$([0-9A-F]+)|add_(tm|hm)\s+(\w+)"
+)
+ITEM_NAME_PATTERN = re.compile(rb'li\s+"([^"]+)"')
+KEY_ITEM_PATTERN = re.compile(rb"dbit\s+(TRUE|FALSE)\s*;\s*(\w+)")
+VEND_ITEM_PATTERN = re.compile(rb"vend_item\s+(\w+),\s+(\d+)")
+MOVE_CONST_PATTERN = re.compile(rb"const\s+(\w+)\s*;\s*([0-9a-fA-F]+)")
+
 
 def create_database():
     """Create SQLite database and tables"""
     # Use the database in the project root
     conn = sqlite3.connect(BASE_DIR / "pokemon.db")
-    cursor = conn.cursor()
+    tune_bulk_load(conn, cache_size_kib=65536)
 
-    # Drop existing items table if it exists
-    cursor.execute("DROP TABLE IF EXISTS items")
-
-    # Create items table
-    cursor.execute(
+    # Drop existing items table if it exists and create it again
+    conn.executescript(
         """
+    DROP TABLE IF EXISTS items;
+
     CREATE TABLE IF NOT EXISTS items (
         id INTEGER PRIMARY KEY,
         name TEXT NOT NULL,
@@ -36,229 +64,183 @@ def create_database():
         move_id INTEGER,
         is_guard_drink INTEGER NOT NULL DEFAULT 0,
         is_key_item INTEGER NOT NULL DEFAULT 0
-    )
+    );
     """
     )
 
-    conn.commit()
-    return conn, cursor
+    return conn
+
+
+def parse_directive_args(content, directive):
+    """Yield the first argument of each line using the given .asm directive"""
+    for line in content.splitlines():
+        # Ignore comments, e.g. "db -1 ; end" -> [b"db", b"-1"]
+        parts = line.split(b";", 1)[0].split(None, 2)
+        if len(parts) > 1 and parts[0] == directive:
+            yield parts[1].rstrip(b",")
 
 
-def parse_item_constants():
-    """Parse item constants to get item IDs and short names"""
+def parse_item_constants_file():
+    """Parse item constants and TM/HM move names from item_constants.asm"""
     item_constants_path = CONSTANTS_DIR / "item_constants.asm"
 
-    with open(item_constants_path, "r") as f:
+    with open(item_constants_path, "rb") as f:
         content = f.read()
 
-    # Extract item constants
-    item_constants = {}
-    pattern = r"const\s+(\w+)\s*;\s*\$([0-9A-F]+)"
-    matches = re.finditer(pattern, content)
+    # Extract item constants (keyed by item ID) along with the TM/HM moves
+    # Format: add_tm MOVE_NAME (creates TM_MOVE_NAME constant and TM##_MOVE = MOVE_NAME)
+    # Format: add_hm MOVE_NAME (creates HM_MOVE_NAME constant and HM##_MOVE = MOVE_NAME)
+    item_id_to_name = {}
+    tm_moves = []
+    hm_moves = []
+    matches = ITEM_CONSTANTS_FILE_PATTERN.finditer(content)
 
     for match in matches:
-        short_name = match.group(1)
-        item_id = int(match.group(2), 16)
-        item_constants[short_name] = item_id
+        if match.group(2) is not None:
+            short_name = match.group(1).decode()
+            item_id = int(match.group(2), 16)
+            item_id_to_name[item_id] = short_name
+        elif match.group(3) == b"tm":
+            tm_moves.append(match.group(4).decode())
+        else:
+            hm_moves.append(match.group(4).decode())
 
-    return item_constants
+    return item_id_to_name, tm_moves, hm_moves
 
 
 def parse_item_names():
     """Parse item names from names.asm"""
     names_path = POKEMON_DATA_DIR / "names.asm"
 
-    with open(names_path, "r") as f:
+    with open(names_path, "rb") as f:
         content = f.read()
 
-    # Extract item names
-    item_names = []
-
     # Find the position of the first assert_list_length NUM_ITEMS
-    assert_pos = content.find("assert_list_length NUM_ITEMS")
-    if assert_pos != -1:
-        # Only parse content up to the assert statement
-        content_to_parse = content[:assert_pos]
-    else:
-        content_to_parse = content
-
-    pattern = r'li\s+"([^"]+)"'
-    matches = re.finditer(pattern, content_to_parse)
-
-    for match in matches:
-        item_name = match.group(1)
-        item_names.append(item_name)
+    assert_pos = content.find(b"assert_list_length NUM_ITEMS")
+    if assert_pos == -1:
+        assert_pos = len(content)
 
-    return item_names
+    # Extract item names, only parsing content up to the assert statement
+    return [
+        item_name.decode()
+        for item_name in ITEM_NAME_PATTERN.findall(content, 0, assert_pos)
+    ]
 
 
 def parse_item_prices():
     """Parse item prices from prices.asm"""
     prices_path = POKEMON_DATA_DIR / "prices.asm"
 
-    with open(prices_path, "r") as f:
+    with open(prices_path, "rb") as f:
         content = f.read()
 
     # Extract item prices
-    item_prices = []
-    pattern = r"bcd3\s+(\d+)"
-    matches = re.finditer(pattern, content)
-
-    for match in matches:
-        price = int(match.group(1))
-        item_prices.append(price)
-
-    return item_prices
+    return [int(price) for price in parse_directive_args(content, b"bcd3")]
 
 
 def parse_key_items():
     """Parse key items from key_items.asm"""
     key_items_path = POKEMON_DATA_DIR / "key_items.asm"
 
-    with open(key_items_path, "r") as f:
+    with open(key_items_path, "rb") as f:
         content = f.read()
 
-    # Extract key items
-    key_items = []
-    pattern = r"dbit\s+(TRUE|FALSE)\s*;\s*(\w+)"
-    matches = re.finditer(pattern, content)
-
-    for match in matches:
-        is_key = match.group(1) == "TRUE"
-        item_name = match.group(2)
-        key_items.append((item_name, is_key))
-
-    return key_items
+    # Extract key items, mapping each item name to whether it is a key item
+    return {
+        match.group(2).decode(): match.group(1) == b"TRUE"
+        for match in KEY_ITEM_PATTERN.finditer(content)
+    }
 
 
 def parse_party_menu_items():
     """Parse items that use party menu from use_party.asm"""
     party_menu_path = POKEMON_DATA_DIR / "use_party.asm"
 
-    with open(party_menu_path, "r") as f:
+    with open(party_menu_path, "rb") as f:
         content = f.read()
 
     # Extract party menu items
     party_menu_items = []
-    pattern = r"db\s+(\w+)"
-    matches = re.finditer(pattern, content)
+    for item_name in parse_directive_args(content, b"db"):
+        if item_name != b"-1":  # Skip the end marker
+            party_menu_items.append(item_name.decode())
 
-    for match in matches:
-        item_name = match.group(1)
-        if item_name != "-1":  # Skip the end marker
-            party_menu_items.append(item_name)
-
-    return party_menu_items
+    return frozenset(party_menu_items)
 
 
 def parse_overworld_items():
     """Parse items usable in overworld from use_overworld.asm"""
     overworld_path = POKEMON_DATA_DIR / "use_overworld.asm"
 
-    with open(overworld_path, "r") as f:
+    with open(overworld_path, "rb") as f:
         content = f.read()
 
     # Extract overworld items
     overworld_items = []
-    pattern = r"db\s+(\w+)"
-    matches = re.finditer(pattern, content)
-
-    for match in matches:
-        item_name = match.group(1)
-        if item_name != "-1":  # Skip the end marker
-            overworld_items.append(item_name)
+    for item_name in parse_directive_args(content, b"db"):
+        if item_name != b"-1":  # Skip the end marker
+            overworld_items.append(item_name.decode())
 
-    return overworld_items
+    return frozenset(overworld_items)
 
 
 def parse_guard_drink_items():
     """Parse guard drink items from guard_drink_items.asm"""
     guard_drink_path = POKEMON_DATA_DIR / "guard_drink_items.asm"
 
-    with open(guard_drink_path, "r") as f:
+    with open(guard_drink_path, "rb") as f:
         content = f.read()
 
     # Extract guard drink items
     guard_drink_items = []
-    pattern = r"db\s+(\w+)"
-    matches = re.finditer(pattern, content)
+    for item_name in parse_directive_args(content, b"db"):
+        if item_name != b"0":  # Skip the end marker
+            guard_drink_items.append(item_name.decode())
 
-    for match in matches:
-        item_name = match.group(1)
-        if item_name != "0":  # Skip the end marker
-            guard_drink_items.append(item_name)
-
-    return guard_drink_items
+    return frozenset(guard_drink_items)
 
 
 def parse_vending_prices():
     """Parse vending prices from vending_prices.asm"""
     vending_path = POKEMON_DATA_DIR / "vending_prices.asm"
 
-    with open(vending_path, "r") as f:
+    with open(vending_path, "rb") as f:
         content = f.read()
 
     # Extract vending prices
     vending_prices = {}
-    pattern = r"vend_item\s+(\w+),\s+(\d+)"
-    matches = re.finditer(pattern, content)
+    matches = VEND_ITEM_PATTERN.finditer(content)
 
     for match in matches:
-        item_name = match.group(1)
+        item_name = match.group(1).decode()
         price = int(match.group(2))
         vending_prices[item_name] = price
 
     return vending_prices
 
 
-def parse_tm_hm_moves():
-    """Parse TM/HM move IDs from item_constants.asm and move_constants.asm"""
+def parse_tm_hm_moves(tm_moves, hm_moves, move_constants):
+    """Map TM/HM item IDs to move IDs using the parsed move constants"""
     tm_hm_moves = {}
 
-    # Read item_constants.asm to get TM/HM move mappings
-    item_constants_path = CONSTANTS_DIR / "item_constants.asm"
-
-    with open(item_constants_path, "r") as f:
-        content = f.read()
-
-    # Extract TM move mappings
-    # Format: add_tm MOVE_NAME (creates TM_MOVE_NAME constant and TM##_MOVE = MOVE_NAME)
-    tm_pattern = r"add_tm\s+(\w+)"
-    tm_matches = re.finditer(tm_pattern, content)
-
-    tm_moves = []
-    for match in tm_matches:
-        move_name = match.group(1)
-        tm_moves.append(move_name)
-
     print(f"Found {len(tm_moves)} TM moves")
 
     # TMs start at item ID 0xC9 (201)
     tm_count = 0
     for i, move_name in enumerate(tm_moves):
         item_id = 0xC9 + i
-        move_id = get_move_id_by_name(move_name)
+        move_id = get_move_id_by_name(move_name, move_constants)
         if move_id:
             tm_hm_moves[item_id] = move_id
             tm_count += 1
 
-    # Extract HM move mappings
-    # Format: add_hm MOVE_NAME (creates HM_MOVE_NAME constant and HM##_MOVE = MOVE_NAME)
-    hm_pattern = r"add_hm\s+(\w+)"
-    hm_matches = re.finditer(hm_pattern, content)
-
-    hm_moves = []
-    for match in hm_matches:
-        move_name = match.group(1)
-        hm_moves.append(move_name)
-
     print(f"Found {len(hm_moves)} HM moves")
 
     # HMs start at item ID 0xC4 (196)
     hm_count = 0
     for i, move_name in enumerate(hm_moves):
         item_id = 0xC4 + i
-        move_id = get_move_id_by_name(move_name)
+        move_id = get_move_id_by_name(move_name, move_constants)
         if move_id:
             tm_hm_moves[item_id] = move_id
             hm_count += 1
@@ -266,82 +248,107 @@ def parse_tm_hm_moves():
     return tm_hm_moves
 
 
-def get_move_id_by_name(move_name):
-    """Get move ID by name from move_constants.asm"""
+def parse_move_constants():
+    """Parse move constants to get move IDs by name from move_constants.asm"""
     move_constants_path = CONSTANTS_DIR / "move_constants.asm"
 
-    with open(move_constants_path, "r") as f:
+    with open(move_constants_path, "rb") as f:
         content = f.read()
 
-    # Find the move constant and get its ID
     # In move_constants.asm, moves are defined as:
     # const MOVE_NAME ; XX (where XX is the hex ID)
-    pattern = r"const\s+(" + re.escape(move_name) + r")\s*;\s*([0-9a-fA-F]+)"
-    match = re.search(pattern, content)
+    move_constants = {}
+    matches = MOVE_CONST_PATTERN.finditer(content)
 
-    if match:
+    for match in matches:
+        move_name = match.group(1).decode()
         # Convert hex value to decimal
         move_id = int(match.group(2), 16)
-        return move_id
+        move_constants[move_name] = move_id
+
+    return move_constants
 
-    # If not found directly, try with different formats
-    # Some moves have special names like PSYCHIC_M instead of PSYCHIC
-    special_cases = {
-        "PSYCHIC": "PSYCHIC_M",
-    }
 
-    if move_name in special_cases:
-        alt_name = special_cases[move_name]
-        pattern = r"const\s+(" + re.escape(alt_name) + r")\s*;\s*([0-9a-fA-F]+)"
-        match = re.search(pattern, content)
-        if match:
-            move_id = int(match.group(2), 16)
-            return move_id
+def get_move_id_by_name(move_name, move_constants):
+    """Get move ID by name from the parsed move constants"""
+    if move_name in move_constants:
+        return move_constants[move_name]
+
+    # If not found directly, try with different formats
+    alt_name = MOVE_NAME_SPECIAL_CASES.get(move_name)
+    if alt_name in move_constants:
+        return move_constants[alt_name]
 
     # Return None if move not found (no warning)
     return None
 
 
-def is_item_usable(item_name, overworld_items, party_menu_items):
-    """Determine if an item is usable based on overworld and party menu lists"""
-    return item_name in overworld_items or item_name in party_menu_items
+def insert_items(conn, rows):
+    """Insert item rows using multi-row INSERT statements"""
+    for start in range(0, len(rows), ROWS_PER_INSERT):
+        chunk = rows[start : start + ROWS_PER_INSERT]
+        placeholders = ", ".join([ITEM_ROW_PLACEHOLDERS] * len(chunk))
+        conn.execute(
+            INSERT_ITEMS_SQL + placeholders, [value for row in chunk for value in row]
+        )
 
 
 def main():
     # Create database
-    conn, cursor = create_database()
-
-    # Parse data
-    item_constants = parse_item_constants()
-    item_names = parse_item_names()
-    item_prices = parse_item_prices()
-    key_items_data = parse_key_items()
-    party_menu_items = parse_party_menu_items()
-    overworld_items = parse_overworld_items()
-    guard_drink_items = parse_guard_drink_items()
-    vending_prices = parse_vending_prices()
-    tm_hm_moves = parse_tm_hm_moves()
-
-    # Create reverse mapping for item constants
-    item_id_to_name = {v: k for k, v in item_constants.items()}
-
-    # Create mapping for key items
-    key_item_map = {}
-    for item_name, is_key in key_items_data:
-        key_item_map[item_name] = is_key
-
-    # Insert items into database
-    item_count = 0
+    conn = create_database()
+
+    # Parse data, the source files are independent so read them concurrently
+    parsers = (
+        parse_item_constants_file,
+        parse_item_names,
+        parse_item_prices,
+        parse_key_items,
+        parse_party_menu_items,
+        parse_overworld_items,
+        parse_guard_drink_items,
+        parse_vending_prices,
+        parse_move_constants,
+    )
+    with ThreadPoolExecutor() as executor:
+        futures = [executor.submit(parser) for parser in parsers]
+
+    (
+        (item_id_to_name, tm_moves, hm_moves),
+        item_names,
+        item_prices,
+        key_item_map,
+        party_menu_items,
+        overworld_items,
+        guard_drink_items,
+        vending_prices,
+        move_constants,
+    ) = [future.result() for future in futures]
+    tm_hm_moves = parse_tm_hm_moves(tm_moves, hm_moves, move_constants)
+
+    # Insert everything in a single transaction
+    conn.execute("BEGIN")
+
+    # Bind the lookups used for every item to locals ahead of the loop
+    get_short_name = item_id_to_name.get
+    get_key_item = key_item_map.get
+    get_vending_price = vending_prices.get
+    get_move_id = tm_hm_moves.get
+
+    # Items are usable from either the overworld or the party menu
+    usable_items = overworld_items | party_menu_items
+
+    # Collect item rows for a batch insert, sqlite3 stores the bools as 0/1
+    item_rows = []
     for i, name in enumerate(item_names):
         item_id = i + 1  # Item IDs start at 1
-        short_name = item_id_to_name.get(item_id, f"UNKNOWN_{item_id}")
+        short_name = get_short_name(item_id, f"UNKNOWN_{item_id}")
         price = item_prices[i]
 
         # Convert 0 price to NULL
         price_value = None if price == 0 else price
 
         # Check if item is usable
-        is_usable = is_item_usable(short_name, overworld_items, party_menu_items)
+        is_usable = short_name in usable_items
 
         # Check if item uses party menu
         uses_party_menu = short_name in party_menu_items
@@ -350,57 +357,41 @@ def main():
         is_guard_drink = short_name in guard_drink_items
 
         # Check if item is a key item
-        is_key_item = key_item_map.get(short_name, False)
+        is_key_item = get_key_item(short_name, False)
 
         # Get vending price if available
-        vending_price = vending_prices.get(short_name)
+        vending_price = get_vending_price(short_name)
 
         # Get move ID if it's a TM/HM
-        move_id = tm_hm_moves.get(item_id)
-
-        # Insert into database
-        cursor.execute(
-            """
-        INSERT INTO items (
-            id, name, short_name, price, is_usable, uses_party_menu, 
-            vending_price, move_id, is_guard_drink, is_key_item
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
+        move_id = get_move_id(item_id)
+
+        item_rows.append(
             (
                 item_id,
                 name,
                 short_name,
                 price_value,
-                1 if is_usable else 0,
-                1 if uses_party_menu else 0,
+                is_usable,
+                uses_party_menu,
                 vending_price,
                 move_id,
-                1 if is_guard_drink else 0,
-                1 if is_key_item else 0,
-            ),
+                is_guard_drink,
+                is_key_item,
+            )
         )
-        item_count += 1
 
-    # Read move names for TM/HM items
-    move_names = {}
-    move_constants_path = CONSTANTS_DIR / "move_constants.asm"
-    with open(move_constants_path, "r") as f:
-        content = f.read()
+    # Insert items into database
+    insert_items(conn, item_rows)
+    item_count = len(item_rows)
 
-    pattern = r"const\s+(\w+)\s*;\s*([0-9a-fA-F]+)"
-    matches = re.finditer(pattern, content)
-    for match in matches:
-        move_name = match.group(1)
-        move_id = int(match.group(2), 16)
-        move_names[move_id] = move_name
+    # Move names for TM/HM items
+    move_names = {move_id: move_name for move_name, move_id in move_constants.items()}
 
-    # Get the next available item ID
-    cursor.execute("SELECT MAX(id) FROM items")
-    max_id = cursor.fetchone()[0]
-    next_id = max_id + 1
+    # HM/TM items take the IDs following the regular items
+    next_id = len(item_names) + 1
 
     # Add HM items (HM01-HM05)
-    hm_count = 0
+    hm_rows = []
     for i in range(5):
         original_item_id = 0xC4 + i  # HMs start at 0xC4
         hm_number = i + 1
@@ -411,34 +402,25 @@ def main():
             item_name = f"HM{hm_number:02d}"
             short_name = f"HM_{move_name}"
 
-            try:
-                # Insert HM item into database with sequential ID
-                cursor.execute(
-                    """
-                INSERT INTO items (
-                    id, name, short_name, price, is_usable, uses_party_menu, 
-                    move_id, is_guard_drink, is_key_item
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                    (
-                        next_id,
-                        item_name,
-                        short_name,
-                        None,  # HMs don't have a price
-                        1,  # HMs are usable
-                        1,  # HMs use party menu
-                        move_id,
-                        0,  # Not a guard drink
-                        1,  # HMs are key items
-                    ),
+            # HM item with sequential ID
+            hm_rows.append(
+                (
+                    next_id,
+                    item_name,
+                    short_name,
+                    None,  # HMs don't have a price
+                    1,  # HMs are usable
+                    1,  # HMs use party menu
+                    None,  # No vending price
+                    move_id,
+                    0,  # Not a guard drink
+                    1,  # HMs are key items
                 )
-                hm_count += 1
-                next_id += 1
-            except sqlite3.Error as e:
-                print(f"Error adding HM item {item_name}: {e}")
+            )
+            next_id += 1
 
     # Add TM items (TM01-TM50)
-    tm_count = 0
+    tm_rows = []
     for i in range(50):
         original_item_id = 0xC9 + i  # TMs start at 0xC9
         tm_number = i + 1
@@ -452,33 +434,27 @@ def main():
             # TMs have a price (placeholder for now)
             price = 3000
 
-            try:
-                # Insert TM item into database with sequential ID
-                cursor.execute(
-                    """
-                INSERT INTO items (
-                    id, name, short_name, price, is_usable, uses_party_menu, 
-                    move_id, is_guard_drink, is_key_item
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                    (
-                        next_id,
-                        item_name,
-                        short_name,
-                        price,
-                        1,  # TMs are usable
-                        1,  # TMs use party menu
-                        move_id,
-                        0,  # Not a guard drink
-                        0,  # TMs are not key items
-                    ),
+            # TM item with sequential ID
+            tm_rows.append(
+                (
+                    next_id,
+                    item_name,
+                    short_name,
+                    price,
+                    1,  # TMs are usable
+                    1,  # TMs use party menu
+                    None,  # No vending price
+                    move_id,
+                    0,  # Not a guard drink
+                    0,  # TMs are not key items
                 )
-                tm_count += 1
-                next_id += 1
-            except sqlite3.Error as e:
-                print(f"Error adding TM item {item_name}: {e}")
+            )
+            next_id += 1
+
+    # Insert HM and TM items into database, rows only exist for known moves
+    insert_items(conn, hm_rows + tm_rows)
 
-    print(f"Added {hm_count} HM items and {tm_count} TM items to the database")
+    print(f"Added {len(hm_rows)} HM items and {len(tm_rows)} TM items to the database")
 
     # Commit changes and close connection
     conn.commit()
@@ -31,7 +31,13 @@ import subprocess
 from pathlib import Path
 import binascii
 import argparse
-from PIL import Image, ImageDraw
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
+import numpy as np
+from PIL import Image
+
+from config import tune_bulk_load
 
 # Constants
 # Get the project root directory (parent of the script's directory)
@@ -45,6 +51,7 @@ TILESETS_DIR = PROJECT_ROOT / "pokemon-game-data/gfx/tilesets"
 TILESET_CONSTANTS_FILE = (
     PROJECT_ROOT / "pokemon-game-data/constants/tileset_constants.asm"
 )
+TILES_RAW_BATCH_SIZE = 50_000  # tiles_raw rows per executemany call
 
 # Regular expressions
 MAP_CONST_PATTERN = re.compile(
@@ -53,14 +60,32 @@ MAP_CONST_PATTERN = re.compile(
 MAP_HEADER_PATTERN = re.compile(r"\s*map_header\s+(\w+),\s+(\w+),\s+(\w+),\s+(.+)")
 TILESET_CONST_PATTERN = re.compile(r"\s*const\s+(\w+)(?:\s*;.*)?$")
 CONNECTION_PATTERN = re.compile(r"\s*connection\s+(\w+),\s+(\w+),\s+(\w+),\s+(-?\d+)")
+HEX_VALUE_PATTERN = re.compile(r"\$([0-9A-Fa-f]+)")
+
+# Byte value -> its 8 bits, MSB first, for decoding 2bpp tile rows
+PIXEL_BITS_LUT = np.array(
+    [[(value >> (7 - bit)) & 1 for bit in range(8)] for value in range(256)],
+    dtype=np.uint8,
+)
 
 
 def create_database():
     """Create SQLite database and tables for map data"""
-    conn = sqlite3.connect(DB_PATH)
+    # Transactions are opened explicitly around each bulk phase
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)
     cursor = conn.cursor()
 
-    # Drop existing tables if they exist
+    # page_size only applies to a new database file and must precede WAL
+    cursor.execute("PRAGMA page_size=8192")
+    tune_bulk_load(conn, cache_size_kib=262144)
+    cursor.execute("PRAGMA locking_mode=EXCLUSIVE")
+
+    # Skip foreign key checks while loading, the REFERENCES clauses document the schema
+    cursor.execute("PRAGMA foreign_keys=OFF")
+
+    # Drop existing tables if they exist. The file also holds the tables of the
+    # other export scripts, so it is cleared table by table rather than deleted,
+    # and every table below is created fresh.
     cursor.execute("DROP TABLE IF EXISTS maps")
     cursor.execute("DROP TABLE IF EXISTS tilesets")
     cursor.execute("DROP TABLE IF EXISTS map_connections")
@@ -72,7 +97,7 @@ def create_database():
     # Create maps table
     cursor.execute(
         """
-    CREATE TABLE IF NOT EXISTS maps (
+    CREATE TABLE maps (
         id INTEGER PRIMARY KEY,
         name TEXT NOT NULL,
         width INTEGER NOT NULL,
@@ -91,7 +116,7 @@ def create_database():
     # Create tilesets table
     cursor.execute(
         """
-    CREATE TABLE IF NOT EXISTS tilesets (
+    CREATE TABLE tilesets (
         id INTEGER PRIMARY KEY,
         name TEXT NOT NULL,
         blockset_path TEXT,
@@ -103,7 +128,7 @@ def create_database():
     # Create blocksets table
     cursor.execute(
         """
-    CREATE TABLE IF NOT EXISTS blocksets (
+    CREATE TABLE blocksets (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         tileset_id INTEGER NOT NULL,
         block_index INTEGER NOT NULL,
@@ -116,7 +141,7 @@ def create_database():
     # Create map_connections table
     cursor.execute(
         """
-    CREATE TABLE IF NOT EXISTS map_connections (
+    CREATE TABLE map_connections (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         from_map_id INTEGER NOT NULL,
         to_map_id INTEGER NOT NULL,
@@ -131,7 +156,7 @@ def create_database():
     # Create tileset_tiles table
     cursor.execute(
         """
-    CREATE TABLE IF NOT EXISTS tileset_tiles (
+    CREATE TABLE tileset_tiles (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         tileset_id INTEGER NOT NULL,
         tile_index INTEGER NOT NULL,
@@ -144,7 +169,7 @@ def create_database():
     # Create collision_tiles table to store collision data from the original game
     cursor.execute(
         """
-    CREATE TABLE IF NOT EXISTS collision_tiles (
+    CREATE TABLE collision_tiles (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         tileset_id INTEGER NOT NULL,
         tileset_name TEXT NOT NULL,
@@ -157,7 +182,7 @@ def create_database():
     # Create tiles_raw table to store raw tile data before processing
     cursor.execute(
         """
-    CREATE TABLE IF NOT EXISTS tiles_raw (
+    CREATE TABLE tiles_raw (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         map_id INTEGER NOT NULL,
         x INTEGER NOT NULL,
@@ -176,6 +201,20 @@ def create_database():
     return conn
 
 
+def create_indexes(cursor):
+    """Create the lookup indexes, once the tables have been bulk loaded"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_maps_name ON maps (name)")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_blocksets_tileset_id ON blocksets (tileset_id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tileset_tiles_tileset_id ON tileset_tiles (tileset_id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tiles_raw_map_id ON tiles_raw (map_id)"
+    )
+
+
 def load_map_constants():
     """Load map constants from the constants file"""
     map_constants = {}
@@ -222,17 +261,18 @@ def load_tileset_constants():
             continue
 
         if in_tileset_section:
+            # Split off the directive and its arguments, ignoring comments
+            parts = line.split(";", 1)[0].replace(",", " ").split()
+
             if "const_def" in line:
                 # Extract starting ID if specified
-                const_def_match = re.search(r"const_def\s+(\d+)", line)
-                if const_def_match:
-                    start_id = int(const_def_match.group(1))
+                if parts[:1] == ["const_def"] and len(parts) > 1 and parts[1].isdigit():
+                    start_id = int(parts[1])
                 continue
 
             # Match const TILESET_NAME
-            const_match = re.search(r"\s*const\s+(\w+)", line)
-            if const_match:
-                name = const_match.group(1)
+            if len(parts) > 1 and parts[0] == "const":
+                name = parts[1]
                 tileset_constants[name] = {"id": start_id, "name": name}
                 start_id += 1
 
@@ -264,48 +304,49 @@ def extract_map_headers():
     map_connections = []
 
     header_files = glob.glob(f"{MAP_HEADERS_DIR}/*.asm")
-    for header_file in header_files:
-        with open(header_file, "r") as f:
-            content = f.read()
-
-        # Extract the map_header directive
-        lines = content.strip().split("\n")
-        map_name = None
-        map_id = None
-
-        for line in lines:
-            line = line.strip()
-
-            # Extract map header
-            match = MAP_HEADER_PATTERN.search(line)
-            if match:
-                map_name = match.group(1)
-                map_id = match.group(2)
-                tileset = match.group(3)
-                connections = match.group(4)
-
-                # Parse connections
-                north_conn = "NORTH" in connections
-                south_conn = "SOUTH" in connections
-                west_conn = "WEST" in connections
-                east_conn = "EAST" in connections
-
-                map_headers[map_name] = {
-                    "map_id": map_id,
-                    "tileset": tileset,
-                    "north_connection": north_conn,
-                    "south_connection": south_conn,
-                    "west_connection": west_conn,
-                    "east_connection": east_conn,
-                }
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        header_contents = list(
+            executor.map(
+                lambda header_file: Path(header_file).read_text(), header_files
+            )
+        )
 
-                # Map the map name to its constant
-                map_to_constant[map_name] = map_id
-                continue
+    for content in header_contents:
+        # Extract the map_header directives; each one owns the connections
+        # that follow it up to the next header
+        header_matches = list(MAP_HEADER_PATTERN.finditer(content))
+        for index, match in enumerate(header_matches):
+            map_name = match.group(1)
+            map_id = match.group(2)
+            tileset = match.group(3)
+            connections = match.group(4)
+
+            # Parse connections
+            north_conn = "NORTH" in connections
+            south_conn = "SOUTH" in connections
+            west_conn = "WEST" in connections
+            east_conn = "EAST" in connections
+
+            map_headers[map_name] = {
+                "map_id": map_id,
+                "tileset": tileset,
+                "north_connection": north_conn,
+                "south_connection": south_conn,
+                "west_connection": west_conn,
+                "east_connection": east_conn,
+            }
+
+            # Map the map name to its constant
+            map_to_constant[map_name] = map_id
 
             # Extract connections
-            conn_match = CONNECTION_PATTERN.search(line)
-            if conn_match and map_name and map_id:
+            if index + 1 < len(header_matches):
+                connections_end = header_matches[index + 1].start()
+            else:
+                connections_end = len(content)
+            for conn_match in CONNECTION_PATTERN.finditer(
+                content, match.end(), connections_end
+            ):
                 direction = conn_match.group(1)
                 connected_map_name = conn_match.group(2)
                 connected_map_id = conn_match.group(3)
@@ -343,19 +384,39 @@ def extract_map_headers():
     return map_headers, map_to_constant, map_connections
 
 
+def scan_files(directory):
+    """Return {file name: os.DirEntry} for the files in a directory
+
+    The entries cache their stat() result, so one scan answers both existence
+    and modification time checks. A missing directory has no files.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name: entry for entry in entries if entry.is_file()}
+    except FileNotFoundError:
+        return {}
+
+
 def extract_map_data():
     """Extract map data from .blk files"""
     map_data = {}
 
-    blk_files = glob.glob(f"{MAPS_DIR}/*.blk")
-    for blk_file in blk_files:
-        map_name = os.path.basename(blk_file).replace(".blk", "")
+    blk_entries = [
+        (file_name, entry)
+        for file_name, entry in scan_files(MAPS_DIR).items()
+        if file_name.endswith(".blk")
+    ]
 
-        with open(blk_file, "rb") as f:
-            blk_data = f.read()
+    # Read the files in parallel, then build the dict in scan order
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        blk_contents = executor.map(
+            lambda blk_entry: Path(blk_entry[1].path).read_bytes(), blk_entries
+        )
+        for (file_name, _), blk_data in zip(blk_entries, blk_contents):
+            map_name = file_name.replace(".blk", "")
 
-        # Store the original blk_data
-        map_data[map_name] = {"blk_data": blk_data}
+            # Store the original blk_data
+            map_data[map_name] = {"blk_data": blk_data}
 
     print(f"Loaded {len(map_data)} map data files")
     return map_data
@@ -373,35 +434,54 @@ def is_overworld_map(map_name, map_headers):
     return False
 
 
+def run_rgbgfx(png_file, bpp_file):
+    """Convert a PNG file to 2bpp with rgbgfx, returning the error if it failed"""
+    try:
+        subprocess.run(
+            ["rgbgfx", "-o", bpp_file, png_file],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        return e
+    return None
+
+
 def ensure_2bpp_files_exist():
     """Check for and generate 2bpp files from PNG files if they don't exist"""
-    png_files = glob.glob(f"{TILESETS_DIR}/*.png")
+    tileset_files = scan_files(TILESETS_DIR)
     generated_count = 0
 
-    for png_file in png_files:
-        base_name = os.path.basename(png_file).replace(".png", "")
-        bpp_file = f"{TILESETS_DIR}/{base_name}.2bpp"
-
-        # Check if 2bpp file exists and is newer than the PNG file
-        if not os.path.exists(bpp_file) or os.path.getmtime(
-            png_file
-        ) > os.path.getmtime(bpp_file):
-            try:
-                print(f"Generating 2bpp file for {base_name}...")
-                result = subprocess.run(
-                    ["rgbgfx", "-o", bpp_file, png_file],
-                    check=True,
-                    capture_output=True,
-                    text=True,
-                )
+    # Collect the PNG files whose 2bpp file is missing or older than the PNG
+    base_names = []
+    outdated_png_files = []
+    bpp_files = []
+    for file_name, png_entry in tileset_files.items():
+        if not file_name.endswith(".png"):
+            continue
+        base_name = file_name.replace(".png", "")
+        bpp_entry = tileset_files.get(f"{base_name}.2bpp")
+
+        if bpp_entry is None or png_entry.stat().st_mtime > bpp_entry.stat().st_mtime:
+            base_names.append(base_name)
+            outdated_png_files.append(png_entry.path)
+            bpp_files.append(f"{TILESETS_DIR}/{base_name}.2bpp")
+
+    # Each conversion is a separate rgbgfx process, so run them concurrently
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        errors = executor.map(run_rgbgfx, outdated_png_files, bpp_files)
+        for base_name, error in zip(base_names, errors):
+            print(f"Generating 2bpp file for {base_name}...")
+            if error is None:
                 generated_count += 1
-            except subprocess.CalledProcessError as e:
-                print(f"Error generating 2bpp file for {base_name}: {e}")
-                print(f"stdout: {e.stdout}")
-                print(f"stderr: {e.stderr}")
-            except FileNotFoundError:
+            elif isinstance(error, FileNotFoundError):
                 print("rgbgfx tool not found. Please install RGBDS tools.")
                 break
+            else:
+                print(f"Error generating 2bpp file for {base_name}: {error}")
+                print(f"stdout: {error.stdout}")
+                print(f"stderr: {error.stderr}")
 
     print(f"Generated {generated_count} 2bpp files")
     return generated_count
@@ -411,17 +491,21 @@ def extract_tileset_data():
     """Extract tileset data"""
     tileset_data = {}
 
+    tileset_files = scan_files(TILESETS_DIR)
+
     # Get all blockset files
-    blockset_files = glob.glob(f"{BLOCKSETS_DIR}/*.bst")
-    for blockset_file in blockset_files:
-        tileset_name = os.path.basename(blockset_file).replace(".bst", "")
+    for file_name, blockset_entry in scan_files(BLOCKSETS_DIR).items():
+        if not file_name.endswith(".bst"):
+            continue
+        blockset_file = blockset_entry.path
+        tileset_name = file_name.replace(".bst", "")
 
         # Find corresponding tileset files
         tileset_png = f"{TILESETS_DIR}/{tileset_name}.png"
         tileset_2bpp = f"{TILESETS_DIR}/{tileset_name}.2bpp"
 
-        has_png = os.path.exists(tileset_png)
-        has_2bpp = os.path.exists(tileset_2bpp)
+        has_png = f"{tileset_name}.png" in tileset_files
+        has_2bpp = f"{tileset_name}.2bpp" in tileset_files
 
         tileset_data[tileset_name.upper()] = {
             "blockset_path": blockset_file,
@@ -433,8 +517,19 @@ def extract_tileset_data():
     return tileset_data
 
 
-def find_matching_blk_file(map_name, map_data):
-    """Find a matching .blk file for a map name using various transformations"""
+def build_lowercase_index(names):
+    """Index names by their lowercase form as (position, name), keeping the first name"""
+    index = {}
+    for position, name in enumerate(names):
+        index.setdefault(name.lower(), (position, name))
+    return index
+
+
+def find_matching_blk_file(map_name, map_data, blk_index):
+    """Find a matching .blk file for a map name using various transformations
+
+    blk_index is the build_lowercase_index() of map_data.
+    """
     # Try direct match
     if map_name in map_data:
         return map_name
@@ -444,13 +539,14 @@ def find_matching_blk_file(map_name, map_data):
     if no_underscores in map_data:
         return no_underscores
 
-    # Try case-insensitive match
-    for blk_name in map_data.keys():
-        if (
-            blk_name.lower() == map_name.lower()
-            or blk_name.lower() == no_underscores.lower()
-        ):
-            return blk_name
+    # Try case-insensitive match, preferring the first .blk file that matches
+    matches = [
+        blk_index[key]
+        for key in (map_name.lower(), no_underscores.lower())
+        if key in blk_index
+    ]
+    if matches:
+        return min(matches)[1]
 
     # Try partial match (map name is part of the blk file name)
     for blk_name in map_data.keys():
@@ -463,8 +559,11 @@ def find_matching_blk_file(map_name, map_data):
     return None
 
 
-def find_tileset_id(tileset_name, tileset_constants):
-    """Find a tileset ID by name using various matching strategies"""
+def find_tileset_id(tileset_name, tileset_constants, tileset_index):
+    """Find a tileset ID by name using various matching strategies
+
+    tileset_index is the build_lowercase_index() of tileset_constants.
+    """
     if not tileset_name:
         return None
 
@@ -473,9 +572,9 @@ def find_tileset_id(tileset_name, tileset_constants):
         return tileset_constants[tileset_name]["id"]
 
     # Case-insensitive match
-    for const_name, const_info in tileset_constants.items():
-        if const_name.lower() == tileset_name.lower():
-            return const_info["id"]
+    match = tileset_index.get(tileset_name.lower())
+    if match:
+        return tileset_constants[match[1]]["id"]
 
     # Partial match
     for const_name, const_info in tileset_constants.items():
@@ -494,23 +593,16 @@ def parse_blockset_file(blockset_path):
     Each block is 16 bytes, representing a 4x4 grid of tile indices.
     These are stored contiguously in the file.
     """
-    blocks = []
-
     try:
         with open(blockset_path, "rb") as f:
-            blockset_data = f.read()
+            blockset_data = np.frombuffer(f.read(), dtype=np.uint8)
 
-        # Each block is 16 bytes (4x4 tile indices)
+        # Each block is 16 bytes (4x4 tile indices), drop any trailing partial block
         block_size = 16
         num_blocks = len(blockset_data) // block_size
+        blocks = blockset_data[: num_blocks * block_size].reshape(-1, block_size)
 
-        for i in range(num_blocks):
-            start_pos = i * block_size
-            end_pos = start_pos + block_size
-            block_data = blockset_data[start_pos:end_pos]
-            blocks.append(block_data)
-
-        return blocks
+        return [block.tobytes() for block in blocks]
     except Exception as e:
         print(f"Error parsing blockset file {blockset_path}: {e}")
         return []
@@ -522,57 +614,32 @@ def parse_2bpp_file(file_path):
     Each tile is 16 bytes (8x8 pixels, 2 bits per pixel).
     Pixels are spread across neighboring bytes.
     """
-    tiles = []
-
     try:
         with open(file_path, "rb") as f:
-            file_data = f.read()
+            file_data = np.frombuffer(f.read(), dtype=np.uint8)
 
-        # Each tile is 16 bytes (8x8 pixels, 2 bits per pixel)
+        # Each tile is 16 bytes (8x8 pixels, 2 bits per pixel), drop any partial tile
         tile_size = 16
         num_tiles = len(file_data) // tile_size
+        tiles = file_data[: num_tiles * tile_size].reshape(-1, tile_size)
 
-        for i in range(num_tiles):
-            start_pos = i * tile_size
-            end_pos = start_pos + tile_size
-            tile_data = file_data[start_pos:end_pos]
-            tiles.append(tile_data)
-
-        return tiles
+        return [tile.tobytes() for tile in tiles]
     except Exception as e:
         print(f"Error parsing 2bpp file {file_path}: {e}")
         return []
 
 
 def decode_2bpp_tile(tile_data):
-    """Decode a 2bpp tile into a 2D array of pixel values (0-3)
+    """Decode a 2bpp tile into an 8x8 array of pixel values (0-3)
 
     Each tile is 8x8 pixels, with 2 bits per pixel.
     Pixels are spread across neighboring bytes.
     """
-    pixels = []
-
-    # Process 16 bytes (8 rows of 2 bytes each)
-    for row in range(8):
-        row_pixels = []
-        # Each row is represented by 2 bytes
-        byte1 = tile_data[row * 2]
-        byte2 = tile_data[row * 2 + 1]
+    # 16 bytes alternate between the low and high bit plane of each row
+    data = np.frombuffer(tile_data[:16], dtype=np.uint8)
 
-        # Process each bit in the bytes
-        for bit in range(8):
-            # Extract the bit from each byte (from MSB to LSB)
-            bit_pos = 7 - bit
-            bit1 = (byte1 >> bit_pos) & 1
-            bit2 = (byte2 >> bit_pos) & 1
-
-            # Combine the bits to get the pixel value (0-3)
-            pixel_value = (bit2 << 1) | bit1
-            row_pixels.append(pixel_value)
-
-        pixels.append(row_pixels)
-
-    return pixels
+    # Combine the bits to get the pixel value (0-3)
+    return (PIXEL_BITS_LUT[data[1::2]] << 1) | PIXEL_BITS_LUT[data[0::2]]
 
 
 def render_map(map_name):
@@ -632,11 +699,10 @@ def render_map(map_name):
         print(f"No tile data found for tileset {tileset_id}")
         return None
 
-    # Create a dictionary of tile_index -> tile_data
-    tiles = {row[0]: row[1] for row in tile_rows}
-
     # Define GameBoy color palette (white, light gray, dark gray, black)
-    palette = [(255, 255, 255), (192, 192, 192), (96, 96, 96), (0, 0, 0)]
+    palette = np.array(
+        [(255, 255, 255), (192, 192, 192), (96, 96, 96), (0, 0, 0)], dtype=np.uint8
+    )
 
     # Calculate image dimensions
     # Each block is 2x2 squares, each square is 16x16 pixels
@@ -645,9 +711,19 @@ def render_map(map_name):
     img_width = width * 32 * scale  # 16 pixels per tile * 2 tiles per block * scale
     img_height = height * 32 * scale  # 16 pixels per tile * 2 tiles per block * scale
 
-    # Create a new image
-    img = Image.new("RGB", (img_width, img_height), color=(255, 255, 255))
-    draw = ImageDraw.Draw(img)
+    # Decode, color and scale every tile once up front:
+    # tile_index -> (8 * scale, 8 * scale, 3) RGB pixels
+    scaled_tiles = {
+        tile_index: palette[decode_2bpp_tile(tile_data)]
+        .repeat(scale, axis=0)
+        .repeat(scale, axis=1)
+        for tile_index, tile_data in tile_rows
+        if tile_data
+    }
+
+    # Render into an RGB framebuffer, starting out white like a blank image
+    framebuffer = np.full((img_height, img_width, 3), 255, dtype=np.uint8)
+    tile_size = 8 * scale
 
     # Render each block in the map
     for y in range(height):
@@ -667,39 +743,23 @@ def render_map(map_name):
                     # Get the tile index from the block data
                     tile_index = block_data[block_y * 4 + block_x]
 
-                    # Get the tile data
-                    tile_data = tiles.get(tile_index)
-                    if not tile_data:
+                    # Get the rendered tile pixels
+                    tile_rgb = scaled_tiles.get(tile_index)
+                    if tile_rgb is None:
                         print(f"Tile {tile_index} not found in tileset")
                         continue
 
-                    # Decode the tile data
-                    tile_pixels = decode_2bpp_tile(tile_data)
-
                     # Calculate the position of this tile in the image
                     # Each tile is 8x8 pixels
                     # Each block is 4x4 tiles (32x32 pixels)
                     tile_x = (x * 32 + block_x * 8) * scale
                     tile_y = (y * 32 + block_y * 8) * scale
 
-                    # Draw the tile with scaling
-                    for py in range(8):
-                        for px in range(8):
-                            pixel_value = tile_pixels[py][px]
-                            pixel_color = palette[pixel_value]
+                    framebuffer[
+                        tile_y : tile_y + tile_size, tile_x : tile_x + tile_size
+                    ] = tile_rgb
 
-                            # Draw a scaled pixel (as a rectangle)
-                            for sy in range(scale):
-                                for sx in range(scale):
-                                    draw.point(
-                                        (
-                                            tile_x + px * scale + sx,
-                                            tile_y + py * scale + sy,
-                                        ),
-                                        fill=pixel_color,
-                                    )
-
-    return img
+    return Image.fromarray(framebuffer)
 
 
 def load_collision_data(conn):
@@ -774,7 +834,7 @@ def load_collision_data(conn):
                     continue
 
                 # Extract the hex values
-                hex_values = re.findall(r"\$([0-9A-Fa-f]+)", tile_ids_part)
+                hex_values = HEX_VALUE_PATTERN.findall(tile_ids_part)
 
                 # Convert hex values to integers
                 for hex_val in hex_values:
@@ -782,6 +842,7 @@ def load_collision_data(conn):
                     collision_data[current_coll].append(tile_id)
 
         # Insert the parsed collision data into the database
+        cursor.execute("BEGIN")
         for coll_name, tile_ids in collision_data.items():
             if coll_name in collision_to_tileset:
                 tileset_info = collision_to_tileset[coll_name]
@@ -797,12 +858,17 @@ def load_collision_data(conn):
                         (tileset_id, tileset_name, tile_id),
                     )
 
-        conn.commit()
+        # Every raw tile's walkability check looks up collision_tiles
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_collision_tiles_tileset_tile ON collision_tiles (tileset_id, tile_id)"
+        )
+
         print(f"Loaded collision data for {len(collision_data)} tilesets")
 
     except Exception as e:
         print(f"Error parsing collision data: {e}")
 
+    conn.commit()
     return conn
 
 
@@ -839,13 +905,39 @@ def is_block_walkable(block_index, tileset_id, conn):
 
     # For tilesets without specific collision data, use a reasonable default
     # Higher block indices tend to be walls and obstacles
-    if count == 0 and block_index >= 30:
+    if block_index >= 30:
         return False
 
     # Default to walkable
     return True
 
 
+def iter_tiles_raw_rows(tiles_raw_maps, conn):
+    """Yield a tiles_raw row for every block of the given maps
+
+    tiles_raw_maps holds (map_id, width, height, tileset_id, is_overworld,
+    blocks) tuples, with blocks a uint8 array of exactly width * height blocks.
+    """
+    for map_id, width, height, tileset_id, is_overworld, blocks in tiles_raw_maps:
+        # Coordinates of every block in row-major order
+        ys, xs = np.divmod(np.arange(width * height), width)
+        overworld_flag = 1 if is_overworld else 0
+
+        for x, y, block_index in zip(xs.tolist(), ys.tolist(), blocks.tolist()):
+            # Determine if the block is walkable using the database
+            is_walkable = is_block_walkable(block_index, tileset_id, conn)
+
+            yield (
+                map_id,
+                x,
+                y,
+                block_index,
+                tileset_id,
+                overworld_flag,
+                1 if is_walkable else 0,
+            )
+
+
 def main():
     # Ensure 2bpp files exist
     ensure_2bpp_files_exist()
@@ -864,10 +956,30 @@ def main():
     map_data = extract_map_data()
     tileset_data = extract_tileset_data()
 
+    # Resolve each tileset and .blk file name once, through lowercase indexes
+    tileset_index = build_lowercase_index(tileset_constants)
+    blk_index = build_lowercase_index(map_data)
+
+    @lru_cache(maxsize=None)
+    def resolve_tileset_id(tileset_name):
+        return find_tileset_id(tileset_name, tileset_constants, tileset_index)
+
+    @lru_cache(maxsize=None)
+    def resolve_blk_file(map_name):
+        return find_matching_blk_file(map_name, map_data, blk_index)
+
+    # Index the headers by map constant, keeping the first header for each
+    headers_by_map_id = {}
+    for header_data in map_headers.values():
+        headers_by_map_id.setdefault(header_data["map_id"], header_data)
+
+    # Insert the tileset phase (tilesets, blocks and tiles) in one transaction
+    db_conn.execute("BEGIN IMMEDIATE")
+
     # Insert tileset data
     tileset_count = 0
     for tileset_name, tileset_info in tileset_data.items():
-        tileset_id = find_tileset_id(tileset_name, tileset_constants)
+        tileset_id = resolve_tileset_id(tileset_name)
 
         if tileset_id is not None:
             cursor.execute(
@@ -885,11 +997,13 @@ def main():
             blockset_path = tileset_info["blockset_path"]
             if os.path.exists(blockset_path):
                 blocks = parse_blockset_file(blockset_path)
-                for block_index, block_data in enumerate(blocks):
-                    cursor.execute(
-                        "INSERT INTO blocksets (tileset_id, block_index, block_data) VALUES (?, ?, ?)",
-                        (tileset_id, block_index, block_data),
-                    )
+                cursor.executemany(
+                    "INSERT INTO blocksets (tileset_id, block_index, block_data) VALUES (?, ?, ?)",
+                    [
+                        (tileset_id, block_index, memoryview(block_data))
+                        for block_index, block_data in enumerate(blocks)
+                    ],
+                )
                 print(f"Inserted {len(blocks)} blocks for tileset {tileset_name}")
             else:
                 print(f"Warning: Blockset file not found: {blockset_path}")
@@ -898,11 +1012,13 @@ def main():
             tileset_2bpp_path = tileset_info["tileset_2bpp_path"]
             if tileset_2bpp_path and os.path.exists(tileset_2bpp_path):
                 tiles = parse_2bpp_file(tileset_2bpp_path)
-                for tile_index, tile_data in enumerate(tiles):
-                    cursor.execute(
-                        "INSERT INTO tileset_tiles (tileset_id, tile_index, tile_data) VALUES (?, ?, ?)",
-                        (tileset_id, tile_index, tile_data),
-                    )
+                cursor.executemany(
+                    "INSERT INTO tileset_tiles (tileset_id, tile_index, tile_data) VALUES (?, ?, ?)",
+                    [
+                        (tileset_id, tile_index, memoryview(tile_data))
+                        for tile_index, tile_data in enumerate(tiles)
+                    ],
+                )
                 print(f"Inserted {len(tiles)} tiles for tileset {tileset_name}")
             else:
                 print(f"Warning: 2bpp file not found: {tileset_2bpp_path}")
@@ -910,24 +1026,22 @@ def main():
             print(f"Warning: No tileset ID found for tileset {tileset_name}")
 
     print(f"Inserted {tileset_count} tilesets into database")
+    db_conn.commit()
+
+    # Insert the map phase (maps, raw tiles and connections), committing after
+    # each tiles_raw batch so the WAL can be checkpointed as the table grows
+    db_conn.execute("BEGIN IMMEDIATE")
 
     # First pass: Process all maps to identify overworld maps and their dimensions
     overworld_maps = {}
     for map_name, map_info in map_constants.items():
         # Find the corresponding map header
-        header_info = None
-        for header_name, header_data in map_headers.items():
-            if header_data["map_id"] == map_name:
-                header_info = header_data
-                break
-
-        if not header_info:
-            header_info = {}
+        header_info = headers_by_map_id.get(map_name, {})
 
         tileset_name = header_info.get("tileset")
         tileset_id = None
         if tileset_name:
-            tileset_id = find_tileset_id(tileset_name, tileset_constants)
+            tileset_id = resolve_tileset_id(tileset_name)
 
             # Check if this is an overworld map (tileset_id = 0)
             is_overworld = tileset_id == 0
@@ -941,30 +1055,23 @@ def main():
                 }
 
     # Insert map data
-    map_count = 0
+    map_rows = []
     tileset_match_count = 0
     for map_name, map_info in map_constants.items():
         map_id = map_info["id"]
 
         # Find the corresponding map header
-        header_info = None
-        for header_name, header_data in map_headers.items():
-            if header_data["map_id"] == map_name:
-                header_info = header_data
-                break
-
-        if not header_info:
-            header_info = {}
+        header_info = headers_by_map_id.get(map_name, {})
 
         tileset_name = header_info.get("tileset")
         tileset_id = None
         if tileset_name:
-            tileset_id = find_tileset_id(tileset_name, tileset_constants)
+            tileset_id = resolve_tileset_id(tileset_name)
             if tileset_id is not None:
                 tileset_match_count += 1
 
         # Find the corresponding .blk file
-        blk_name = find_matching_blk_file(map_name, map_data)
+        blk_name = resolve_blk_file(map_name)
         blk_data = None
         if blk_name:
             blk_data = map_data[blk_name]["blk_data"]
@@ -977,61 +1084,47 @@ def main():
             width = map_info["width"]
             height = map_info["height"]
 
-            # Convert blk_data to a list of bytes
-            blk_bytes = list(blk_data)
-
-            # Reshape into a 2D grid (rows x columns)
-            grid = []
-            for y in range(height):
-                row = []
-                for x in range(width):
-                    idx = y * width + x
-                    if idx < len(blk_bytes):
-                        row.append(blk_bytes[idx])
-                    else:
-                        row.append(0)  # Pad with zeros if needed
-                grid.append(row)
+            # Fit the blocks to a height x width grid, padding with zeros if needed
+            grid = np.zeros(width * height, dtype=np.uint8)
+            block_count = min(len(blk_data), grid.size)
+            grid[:block_count] = np.frombuffer(
+                blk_data, dtype=np.uint8, count=block_count
+            )
 
             # Reverse the rows to invert y-coordinates
-            grid.reverse()
-
-            # Flatten back to 1D
-            inverted_blk_bytes = []
-            for row in grid:
-                inverted_blk_bytes.extend(row)
-
-            # Convert back to bytes
-            blk_data = bytes(inverted_blk_bytes)
+            blk_data = grid.reshape(height, width)[::-1].tobytes()
 
         # Insert map data even if some fields are missing
-        cursor.execute(
-            """
-            INSERT INTO maps (id, name, width, height, tileset_id, blk_data, is_overworld)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
+        map_rows.append(
             (
                 map_id,
                 map_name,
                 map_info["width"],
                 map_info["height"],
                 tileset_id,
-                blk_data,
+                memoryview(blk_data) if blk_data is not None else None,
                 1 if tileset_id == 0 else 0,
-            ),
+            )
         )
-        map_count += 1
 
         if not blk_name:
             print(f"Warning: No matching .blk file found for map {map_name}")
         if tileset_id is None and tileset_name:
             print(f"Warning: No tileset ID found for tileset {tileset_name}")
 
-    print(f"Inserted {map_count} maps into database")
+    cursor.executemany(
+        """
+        INSERT INTO maps (id, name, width, height, tileset_id, blk_data, is_overworld)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        map_rows,
+    )
+    print(f"Inserted {len(map_rows)} maps into database")
     print(f"Maps with matching tileset IDs: {tileset_match_count}")
 
     # Populate tiles_raw table with raw tile data
     print("Populating tiles_raw table...")
-    tiles_raw_count = 0
+    tiles_raw_maps = []
 
     # Clear existing data
     cursor.execute("DELETE FROM tiles_raw")
@@ -1043,12 +1136,7 @@ def main():
         height = map_info["height"]
 
         # Find the corresponding map header to get tileset
-        header_info = None
-        for header_name, header_data in map_headers.items():
-            if header_data["map_id"] == map_name:
-                header_info = header_data
-                break
-
+        header_info = headers_by_map_id.get(map_name)
         if not header_info:
             continue
 
@@ -1056,7 +1144,7 @@ def main():
         if not tileset_name:
             continue
 
-        tileset_id = find_tileset_id(tileset_name, tileset_constants)
+        tileset_id = resolve_tileset_id(tileset_name)
         if tileset_id is None:
             continue
 
@@ -1064,95 +1152,78 @@ def main():
         is_overworld = tileset_id == 0
 
         # Find the corresponding .blk file
-        blk_name = find_matching_blk_file(map_name, map_data)
+        blk_name = resolve_blk_file(map_name)
         if not blk_name or not map_data[blk_name]["blk_data"]:
             continue
 
         blk_data = map_data[blk_name]["blk_data"]
 
-        # Convert blk_data to a list of integers
+        # Convert blk_data to bytes
         try:
             # If blk_data is already a bytes object
             if isinstance(blk_data, bytes):
-                blk_bytes = list(blk_data)
-            # If blk_data is a string representation of hex
-            elif isinstance(blk_data, str) and all(
-                c in "0123456789ABCDEFabcdef" for c in blk_data
-            ):
-                blk_bytes = [
-                    int(blk_data[i : i + 2], 16) for i in range(0, len(blk_data), 2)
-                ]
+                blk_bytes = blk_data
             else:
-                # Try to convert from binary string
-                blk_bytes = list(map(ord, blk_data))
+                try:
+                    # If blk_data is a string representation of hex
+                    blk_bytes = bytes.fromhex(blk_data)
+                except ValueError:
+                    # Try to convert from binary string
+                    blk_bytes = blk_data.encode("latin-1")
         except Exception as e:
             print(f"Error processing blk_data for map {map_name}: {e}")
             continue
 
-        # Verify we have the expected number of blocks
+        # Fit the blocks to the expected number, padding with zeros or truncating
         expected_blocks = width * height
-        if len(blk_bytes) < expected_blocks:
-            # Pad with zeros if needed
-            blk_bytes.extend([0] * (expected_blocks - len(blk_bytes)))
-        elif len(blk_bytes) > expected_blocks:
-            # Truncate if needed
-            blk_bytes = blk_bytes[:expected_blocks]
-
-        # Process each block in the map
-        for y in range(height):
-            for x in range(width):
-                # Get the block index from the map data
-                block_pos = y * width + x
-                if block_pos < len(blk_bytes):
-                    block_index = blk_bytes[block_pos]
-
-                    # Determine if the block is walkable using the database
-                    is_walkable = is_block_walkable(block_index, tileset_id, db_conn)
-
-                    # Insert into tiles_raw table
-                    cursor.execute(
-                        """
-                        INSERT INTO tiles_raw (map_id, x, y, block_index, tileset_id, is_overworld, is_walkable)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        (
-                            map_id,
-                            x,
-                            y,
-                            block_index,
-                            tileset_id,
-                            1 if is_overworld else 0,
-                            1 if is_walkable else 0,
-                        ),
-                    )
-                    tiles_raw_count += 1
+        block_count = min(len(blk_bytes), expected_blocks)
+        blocks = np.zeros(expected_blocks, dtype=np.uint8)
+        blocks[:block_count] = np.frombuffer(
+            blk_bytes, dtype=np.uint8, count=block_count
+        )
 
-                    # Commit every 1000 inserts to avoid transaction getting too large
-                    if tiles_raw_count % 1000 == 0:
-                        db_conn.commit()
-                        print(f"Inserted {tiles_raw_count} raw tiles so far...")
+        tiles_raw_maps.append((map_id, width, height, tileset_id, is_overworld, blocks))
 
-    db_conn.commit()
+    # Insert into tiles_raw table in fixed-size batches, streaming the rows
+    # rather than building them all
+    tiles_raw_rows = iter_tiles_raw_rows(tiles_raw_maps, db_conn)
+    changes_before_tiles_raw = db_conn.total_changes
+    tiles_raw_count = 0
+    while True:
+        batch = list(islice(tiles_raw_rows, TILES_RAW_BATCH_SIZE))
+        if not batch:
+            break
+        cursor.executemany(
+            """
+            INSERT INTO tiles_raw (map_id, x, y, block_index, tileset_id, is_overworld, is_walkable)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            batch,
+        )
+        tiles_raw_count = db_conn.total_changes - changes_before_tiles_raw
+        print(f"Inserted {tiles_raw_count} raw tiles so far...")
+        db_conn.commit()
+        db_conn.execute("BEGIN IMMEDIATE")
     print(f"Inserted {tiles_raw_count} raw tiles into tiles_raw table")
 
     # Insert map connections
-    connection_count = 0
-    for connection in map_connections:
-        cursor.execute(
-            """
-            INSERT INTO map_connections (from_map_id, to_map_id, direction, offset)
-            VALUES (?, ?, ?, ?)
-            """,
+    cursor.executemany(
+        """
+        INSERT INTO map_connections (from_map_id, to_map_id, direction, offset)
+        VALUES (?, ?, ?, ?)
+        """,
+        [
             (
                 connection["from_map_id"],
                 connection["to_map_id"],
                 connection["direction"],
                 connection["offset"],
-            ),
-        )
-        connection_count += 1
+            )
+            for connection in map_connections
+        ],
+    )
 
-    print(f"Inserted {connection_count} map connections into database")
+    print(f"Inserted {len(map_connections)} map connections into database")
 
     # Add a special table to store overworld map positioning information
     cursor.execute("DROP TABLE IF EXISTS overworld_map_positions")
@@ -1167,6 +1238,9 @@ def main():
         """
     )
 
+    # Index the tables now that everything is loaded
+    create_indexes(cursor)
+
     db_conn.commit()
     db_conn.close()
 
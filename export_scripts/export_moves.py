@@ -4,6 +4,8 @@ import re
 import sqlite3
 from pathlib import Path
 
+from config import tune_bulk_load
+
 # Constants
 # Get the project root directory (parent of the script's directory)
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -31,12 +33,39 @@ TYPE_MAPPING = {
     "PSYCHIC_TYPE": "PSYCHIC",
 }
 
+# Sound data for moves missing from the sound table
+DEFAULT_MOVE_SOUND = {"sound": "NO_SOUND", "pitch": 0, "tempo": 0}
+
+# Regular expressions
+MOVE_CONSTANT_PATTERN = re.compile(r"const (\w+)[ \t]*; (\w+)")
+MOVES_TABLE_START_PATTERN = re.compile(r"^[ \t]*Moves:[ \t]*$", re.M)
+MOVE_NAMES_START_PATTERN = re.compile(r"^[ \t]*MoveNames::[ \t]*$", re.M)
+MOVE_SOUNDS_START_PATTERN = re.compile(r"^[ \t]*MoveSoundTable:[ \t]*$", re.M)
+TABLE_END_PATTERN = re.compile(r"^[ \t]*assert_table_length", re.M)
+LIST_END_PATTERN = re.compile(r"^[ \t]*assert_list_length", re.M)
+MOVE_PATTERN = re.compile(
+    r"^[ \t]*move (\w+),\s+(\w+),\s+(\d+), (\w+),\s+(\d+), (\d+)", re.M
+)
+MOVE_NAME_PATTERN = re.compile(r'^[ \t]*li "([^"]+)"', re.M)
+MOVE_SOUND_PATTERN = re.compile(
+    r"^[ \t]*db (\w+),\s+\$([0-9a-f]+), \$([0-9a-f]+)", re.M
+)
+# A "; set N" line (group 1) or a "db MOVE" line (group 2); db 0 / db -1 end a set
+GRAMMAR_LINE_PATTERN = re.compile(
+    r"^[ \t]*(?:; set (\d+)|db (?!0|-1)[ \t]*(\S.*?)[ \t\r]*$)", re.M
+)
+ANIMATION_LABEL_PATTERN = re.compile(r"^(\w+)Anim:", re.M)
+BATTLE_ANIM_PATTERN = re.compile(r"battle_anim (\w+),\s+(\w+)(?:,\s+(\d+),\s+(\d+))?")
+
 
 def create_database():
     """Create SQLite database and tables"""
-    conn = sqlite3.connect(DB_PATH)
+    # Transactions are opened explicitly around the bulk insert
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)
     cursor = conn.cursor()
 
+    tune_bulk_load(conn, cache_size_kib=200000)
+
     # Drop existing moves table if it exists
     cursor.execute("DROP TABLE IF EXISTS moves")
 
@@ -69,24 +98,41 @@ def create_database():
     return conn
 
 
+def find_table_section(content, start_pattern, end_pattern):
+    """Return the part of content between a table label and its end directive
+
+    The line after the label (table_width or list_start) is skipped. If the
+    label is missing the table is assumed to start at the top of the file.
+    """
+    start = 0
+    label = start_pattern.search(content)
+    if label:
+        # Skip the rest of the label line and the line after it
+        start = len(content)
+        next_line = content.find("\n", label.end() + 1)
+        if next_line != -1:
+            start = next_line + 1
+
+    end = end_pattern.search(content, start)
+    return content[start : end.start() if end else len(content)]
+
+
 def parse_move_constants():
     """Parse move constants from move_constants.asm"""
     move_constants = {}
 
     with open(CONSTANTS_DIR / "move_constants.asm", "r") as f:
-        lines = f.readlines()
-
-    for line in lines:
-        match = re.search(r"const (\w+)\s*; (\w+)", line)
-        if match:
-            move_name = match.group(1)
-            move_id_str = match.group(2)
-            try:
-                move_id = int(move_id_str, 16)
-                move_constants[move_name] = move_id
-            except ValueError:
-                # Skip constants that don't have a valid hex ID
-                continue
+        content = f.read()
+
+    for match in MOVE_CONSTANT_PATTERN.finditer(content):
+        move_name = match.group(1)
+        move_id_str = match.group(2)
+        try:
+            move_id = int(move_id_str, 16)
+            move_constants[move_name] = move_id
+        except ValueError:
+            # Skip constants that don't have a valid hex ID
+            continue
 
     return move_constants
 
@@ -97,73 +143,44 @@ def parse_move_data():
     move_name_to_type = {}  # New mapping of move names to types
 
     with open(POKEMON_DATA_DIR / "moves.asm", "r") as f:
-        lines = f.readlines()
-
-    # Skip header lines until we reach the moves table
-    start_index = 0
-    for i, line in enumerate(lines):
-        if line.strip() == "Moves:":
-            start_index = i + 2  # Skip the table_width line
-            break
-
-    # Parse each move entry
-    move_id = 1
-    for i in range(start_index, len(lines)):
-        line = lines[i].strip()
-        if line.startswith("assert_table_length"):
-            break
-
-        if line.startswith("move "):
-            # Extract move data using regex
-            match = re.match(
-                r"move (\w+),\s+(\w+),\s+(\d+), (\w+),\s+(\d+), (\d+)", line
-            )
-            if match:
-                animation, effect, power, type_name, accuracy, pp = match.groups()
-                # Map the type name to its proper value
-                type_name = TYPE_MAPPING.get(type_name, type_name)
-                moves_data[animation] = {
-                    "animation": animation,
-                    "effect": effect,
-                    "power": int(power),
-                    "type": type_name,
-                    "accuracy": int(accuracy),
-                    "pp": int(pp),
-                }
-                # Store the mapping of move name to type
-                move_name_to_type[animation] = type_name
+        content = f.read()
+
+    # Parse each move entry of the moves table
+    table = find_table_section(content, MOVES_TABLE_START_PATTERN, TABLE_END_PATTERN)
+    for match in MOVE_PATTERN.finditer(table):
+        animation, effect, power, type_name, accuracy, pp = match.groups()
+        # Map the type name to its proper value
+        type_name = TYPE_MAPPING.get(type_name, type_name)
+        moves_data[animation] = {
+            "animation": animation,
+            "effect": effect,
+            "power": int(power),
+            "type": type_name,
+            "accuracy": int(accuracy),
+            "pp": int(pp),
+        }
+        # Store the mapping of move name to type
+        move_name_to_type[animation] = type_name
 
     return moves_data, move_name_to_type
 
 
 def parse_move_names():
-    """Parse move names from names.asm"""
+    """Parse move names from names.asm
+
+    Returns a dict of move ID -> (name, short_name), where short_name is the
+    name in uppercase with spaces replaced by underscores.
+    """
     move_names = {}
 
     with open(POKEMON_DATA_DIR / "names.asm", "r") as f:
-        lines = f.readlines()
-
-    # Skip header lines until we reach the move names
-    start_index = 0
-    for i, line in enumerate(lines):
-        if line.strip() == "MoveNames::":
-            start_index = i + 2  # Skip the list_start line
-            break
-
-    # Parse each move name
-    move_id = 1
-    for i in range(start_index, len(lines)):
-        line = lines[i].strip()
-        if line.startswith("assert_list_length"):
-            break
-
-        if line.startswith('li "'):
-            # Extract move name
-            match = re.match(r'li "([^"]+)"', line)
-            if match:
-                name = match.group(1)
-                move_names[move_id] = name
-                move_id += 1
+        content = f.read()
+
+    # Parse each move name of the move names list
+    names = find_table_section(content, MOVE_NAMES_START_PATTERN, LIST_END_PATTERN)
+    for move_id, match in enumerate(MOVE_NAME_PATTERN.finditer(names), start=1):
+        name = match.group(1)
+        move_names[move_id] = (name, name.replace(" ", "_").upper())
 
     return move_names
 
@@ -173,33 +190,17 @@ def parse_move_sounds():
     move_sounds = {}
 
     with open(POKEMON_DATA_DIR / "sfx.asm", "r") as f:
-        lines = f.readlines()
-
-    # Skip header lines until we reach the sound table
-    start_index = 0
-    for i, line in enumerate(lines):
-        if line.strip() == "MoveSoundTable:":
-            start_index = i + 2  # Skip the table_width line
-            break
-
-    # Parse each sound entry
-    move_id = 1
-    for i in range(start_index, len(lines)):
-        line = lines[i].strip()
-        if line.startswith("assert_table_length"):
-            break
-
-        if line.startswith("db "):
-            # Extract sound data
-            match = re.match(r"db (\w+),\s+\$([0-9a-f]+), \$([0-9a-f]+)", line)
-            if match:
-                sound, pitch, tempo = match.groups()
-                move_sounds[move_id] = {
-                    "sound": sound,
-                    "pitch": int(pitch, 16),
-                    "tempo": int(tempo, 16),
-                }
-                move_id += 1
+        content = f.read()
+
+    # Parse each sound entry of the sound table
+    table = find_table_section(content, MOVE_SOUNDS_START_PATTERN, TABLE_END_PATTERN)
+    for move_id, match in enumerate(MOVE_SOUND_PATTERN.finditer(table), start=1):
+        sound, pitch, tempo = match.groups()
+        move_sounds[move_id] = {
+            "sound": sound,
+            "pitch": int(pitch, 16),
+            "tempo": int(tempo, 16),
+        }
 
     return move_sounds
 
@@ -209,26 +210,15 @@ def parse_move_grammar():
     move_grammar = {}
 
     with open(POKEMON_DATA_DIR / "grammar.asm", "r") as f:
-        lines = f.readlines()
+        content = f.read()
 
-    # Parse each grammar set
+    # Parse each grammar set, visiting only the set and db lines
     current_set = 0
-    for i, line in enumerate(lines):
-        line = line.strip()
-
-        if line.startswith("; set "):
-            # Extract set number
-            match = re.match(r"; set (\d+)", line)
-            if match:
-                current_set = int(match.group(1))
-
-        elif (
-            line.startswith("db ")
-            and not line.startswith("db 0")
-            and not line.startswith("db -1")
-        ):
-            # Extract move name
-            move_name = line.replace("db ", "").strip()
+    for match in GRAMMAR_LINE_PATTERN.finditer(content):
+        set_number, move_name = match.groups()
+        if set_number is not None:
+            current_set = int(set_number)
+        else:
             move_grammar[move_name] = current_set
 
     return move_grammar
@@ -239,47 +229,37 @@ def parse_battle_animations():
     battle_animations = {}
 
     with open(POKEMON_DATA_DIR / "animations.asm", "r") as f:
-        lines = f.readlines()
-
-    # Find all animation definitions
-    current_move = None
-    for i, line in enumerate(lines):
-        # Check for animation label (e.g., "PoundAnim:")
-        anim_match = re.match(r"(\w+)Anim:", line)
-        if anim_match:
-            current_move = anim_match.group(1).upper()
-            battle_animations[current_move] = []
-
-        # Check for battle_anim macro
-        if "battle_anim" in line and current_move:
-            match = re.search(
-                r"battle_anim (\w+),\s+(\w+)(?:,\s+(\d+),\s+(\d+))?", line
-            )
-            if match:
-                groups = match.groups()
-                move_sound = groups[0]
-                subanimation = groups[1]
-
-                if groups[2] is not None and groups[3] is not None:
-                    tileset = int(groups[2])
-                    delay = int(groups[3])
-                    battle_animations[current_move].append(
-                        {
-                            "sound": move_sound,
-                            "subanimation": subanimation,
-                            "tileset": tileset,
-                            "delay": delay,
-                        }
-                    )
-                else:
-                    battle_animations[current_move].append(
-                        {
-                            "sound": move_sound,
-                            "subanimation": subanimation,
-                            "tileset": None,
-                            "delay": None,
-                        }
-                    )
+        content = f.read()
+
+    # Split the file at each animation label (e.g., "PoundAnim:"), giving
+    # (label name, body) pairs after the text before the first label
+    blocks = ANIMATION_LABEL_PATTERN.split(content)
+    for label_name, body in zip(blocks[1::2], blocks[2::2]):
+        current_move = label_name.upper()
+        battle_animations[current_move] = []
+
+        # Collect the battle_anim macros of this animation
+        for match in BATTLE_ANIM_PATTERN.finditer(body):
+            move_sound, subanimation, tileset, delay = match.groups()
+
+            if tileset is not None and delay is not None:
+                battle_animations[current_move].append(
+                    {
+                        "sound": move_sound,
+                        "subanimation": subanimation,
+                        "tileset": int(tileset),
+                        "delay": int(delay),
+                    }
+                )
+            else:
+                battle_animations[current_move].append(
+                    {
+                        "sound": move_sound,
+                        "subanimation": subanimation,
+                        "tileset": None,
+                        "delay": None,
+                    }
+                )
 
     return battle_animations
 
@@ -297,82 +277,71 @@ def main():
     move_grammar = parse_move_grammar()
     battle_animations = parse_battle_animations()
 
-    # Insert data into database
-    for move_name, move_data in moves_data.items():
-        # Get the move ID from the constants
-        move_id = move_constants.get(move_name, 0)
-        if move_id == 0:
-            continue  # Skip moves without a valid ID
+    # Join the data parsed from each file once, keyed by move ID
+    merged_moves = {}
+    for move_name, move_id in move_constants.items():
+        move_data = moves_data.get(move_name)
+        if move_id == 0 or move_data is None:
+            continue  # Skip moves without a valid ID or move data
 
-        # Get sound data
-        sound_data = move_sounds.get(
-            move_id, {"sound": "NO_SOUND", "pitch": 0, "tempo": 0}
+        animation = move_data["animation"]
+        name, short_name = move_names.get(
+            move_id, (f"MOVE_{move_id}", f"MOVE_{move_id}")
         )
 
-        # Get the proper name from move_names
-        name = move_names.get(move_id, f"MOVE_{move_id}")
-        # Generate short_name by converting the name to uppercase and replacing spaces with underscores
-        short_name = name.replace(" ", "_").upper()
-
-        # Check if it's a field move
-        field_move_effect = 1 if short_name in FIELD_MOVES else 0
-
-        # Check if it's an HM move
-        is_hm = 1 if short_name in HM_MOVES else 0
-
-        # Get grammar type
-        grammar_type = move_grammar.get(move_data["animation"], 0)
-
-        # Get battle animation data
-        battle_anim_data = battle_animations.get(
-            move_data["animation"],
-            [{"subanimation": "NO_SUBANIMATION", "tileset": 0, "delay": 0}],
+        # Use the first battle animation entry if available
+        battle_anim_data = battle_animations.get(animation)
+        first_anim = battle_anim_data[0] if battle_anim_data else {}
+
+        merged_moves[move_id] = {
+            **move_data,
+            "name": name,
+            "short_name": short_name,
+            "sound": move_sounds.get(move_id, DEFAULT_MOVE_SOUND),
+            "grammar_type": move_grammar.get(animation, 0),
+            "battle_subanimation": first_anim.get("subanimation", "NO_SUBANIMATION"),
+            "battle_tileset": first_anim.get("tileset") or 0,
+            "battle_delay": first_anim.get("delay") or 0,
+        }
+
+    # Collect the rows to insert in move ID order
+    move_rows = [
+        (
+            move_id,
+            move["name"],
+            move["short_name"],
+            move["effect"],
+            move["power"],
+            move["type"],
+            move["accuracy"],
+            move["pp"],
+            move["animation"],
+            move["sound"]["sound"],
+            move["sound"]["pitch"],
+            move["sound"]["tempo"],
+            move["battle_subanimation"],
+            move["battle_tileset"],
+            move["battle_delay"],
+            1 if move["short_name"] in FIELD_MOVES else 0,
+            move["grammar_type"],
+            1 if move["short_name"] in HM_MOVES else 0,
         )
+        for move_id, move in sorted(merged_moves.items())
+    ]
 
-        # Use the first animation entry if available
-        battle_subanimation = "NO_SUBANIMATION"
-        battle_tileset = 0
-        battle_delay = 0
-
-        if battle_anim_data:
-            first_anim = battle_anim_data[0]
-            battle_subanimation = first_anim.get("subanimation", "NO_SUBANIMATION")
-            battle_tileset = first_anim.get("tileset", 0) or 0
-            battle_delay = first_anim.get("delay", 0) or 0
-
-        # Get the type for this move
-        type_name = move_data["type"]
-
-        cursor.execute(
-            """
-            INSERT INTO moves (
-                id, name, short_name, effect, power, type, accuracy, pp,
-                battle_animation, battle_sound, battle_sound_pitch, battle_sound_tempo,
-                battle_subanimation, battle_tileset, battle_delay,
-                field_move_effect, grammar_type, is_hm
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                move_id,
-                name,
-                short_name,
-                move_data["effect"],
-                move_data["power"],
-                type_name,
-                move_data["accuracy"],
-                move_data["pp"],
-                move_data["animation"],
-                sound_data["sound"],
-                sound_data["pitch"],
-                sound_data["tempo"],
-                battle_subanimation,
-                battle_tileset,
-                battle_delay,
-                field_move_effect,
-                grammar_type,
-                is_hm,
-            ),
-        )
+    # Insert data into database in a single transaction
+    conn.execute("BEGIN")
+    cursor.executemany(
+        """
+        INSERT INTO moves (
+            id, name, short_name, effect, power, type, accuracy, pp,
+            battle_animation, battle_sound, battle_sound_pitch, battle_sound_tempo,
+            battle_subanimation, battle_tileset, battle_delay,
+            field_move_effect, grammar_type, is_hm
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        move_rows,
+    )
 
     # Commit changes and close connection
     conn.commit()
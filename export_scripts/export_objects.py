@@ -2,8 +2,12 @@
 import os
 import re
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
+from config import tune_bulk_load
+
 # Constants
 # Get the project root directory (parent of the script's directory)
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -17,12 +21,30 @@ OBJECT_TYPE_BG = "sign"
 OBJECT_TYPE_OBJECT = "npc"
 OBJECT_TYPE_ITEM = "item"
 
+# Regular expressions
+CAMEL_WORD_PATTERN = re.compile("(.)([A-Z][a-z]+)")
+CAMEL_BOUNDARY_PATTERN = re.compile("([a-z0-9])([A-Z])")
+BG_SECTION_PATTERN = re.compile(
+    rb"def_bg_events(.*?)(?:def_object_events|\Z)", re.DOTALL
+)
+BG_EVENT_PATTERN = re.compile(rb"bg_event\s+(\d+),\s+(\d+),\s+(\w+)")
+OBJECT_SECTION_PATTERN = re.compile(
+    rb"def_object_events(.*?)(?:def_warps_to|\Z)", re.DOTALL
+)
+OBJECT_EVENT_PATTERN = re.compile(
+    rb"object_event\s+(\d+),\s+(\d+),\s+(\w+),\s+(\w+),\s+(\w+),\s+(\w+)(?:,\s+(\w+)(?:,\s+(\w+))?)?"
+)
+ITEM_SPRITE_PATTERN = re.compile(r"ITEM_(\d+)")
+
 
 def create_database():
     """Create SQLite database and objects table"""
-    conn = sqlite3.connect(DB_PATH)
+    # Transactions are opened explicitly around the bulk insert
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)
     cursor = conn.cursor()
 
+    tune_bulk_load(conn, cache_size_kib=200000)
+
     # Drop existing objects table if it exists
     cursor.execute("DROP TABLE IF EXISTS objects")
 
@@ -55,39 +77,35 @@ def create_database():
 
 
 def get_all_maps(cursor):
-    """Get all maps from the database"""
+    """Get all maps from the database, keeping the first ID for each name"""
     cursor.execute("SELECT id, name FROM maps")
-    return {name: id for id, name in cursor.fetchall()}
+    maps_by_name = {}
+    for id, name in cursor.fetchall():
+        maps_by_name.setdefault(name, id)
+    return maps_by_name
 
 
+@lru_cache(maxsize=None)
 def convert_camel_to_upper_underscore(name):
     """Convert CamelCase to UPPER_CASE_WITH_UNDERSCORES"""
-    s1 = re.sub("(.)([A-Z][a-z]+)", r"\1_\2", name)
-    return re.sub("([a-z0-9])([A-Z])", r"\1_\2", s1).upper()
+    s1 = CAMEL_WORD_PATTERN.sub(r"\1_\2", name)
+    return CAMEL_BOUNDARY_PATTERN.sub(r"\1_\2", s1).upper()
 
 
-def get_map_id_for_map(map_name, cursor):
-    """Get map ID for a map from the maps table"""
+def get_map_id_for_map(map_name, maps_by_name, maps_by_lower_name):
+    """Get map ID for a map from the maps lookups built in main"""
     # Try exact match first
-    cursor.execute("SELECT id FROM maps WHERE name = ?", (map_name,))
-    result = cursor.fetchone()
-    if result:
-        return result[0]
+    map_id = maps_by_name.get(map_name)
+    if map_id is not None:
+        return map_id
 
     # Try case-insensitive match
-    cursor.execute("SELECT id FROM maps WHERE LOWER(name) = LOWER(?)", (map_name,))
-    result = cursor.fetchone()
-    if result:
-        return result[0]
+    map_id = maps_by_lower_name.get(map_name.lower())
+    if map_id is not None:
+        return map_id
 
     # Convert CamelCase to UPPER_CASE_WITH_UNDERSCORES
-    upper_with_underscores = convert_camel_to_upper_underscore(map_name)
-    cursor.execute("SELECT id FROM maps WHERE name = ?", (upper_with_underscores,))
-    result = cursor.fetchone()
-    if result:
-        return result[0]
-
-    return None
+    return maps_by_name.get(convert_camel_to_upper_underscore(map_name))
 
 
 def parse_map_name_from_file(file_path):
@@ -98,26 +116,23 @@ def parse_map_name_from_file(file_path):
 
 
 def parse_bg_events(content, map_name):
-    """Parse background events (signs) from the map object file"""
+    """Parse background events (signs) from the raw bytes of a map object file"""
     signs = []
 
     # Find the bg events section
-    bg_section_match = re.search(
-        r"def_bg_events(.*?)(?:def_object_events|\Z)", content, re.DOTALL
-    )
+    bg_section_match = BG_SECTION_PATTERN.search(content)
     if not bg_section_match:
         return signs
 
     bg_section = bg_section_match.group(1)
 
     # Extract individual bg events
-    bg_pattern = r"bg_event\s+(\d+),\s+(\d+),\s+(\w+)"
-    bg_matches = re.finditer(bg_pattern, bg_section)
+    bg_matches = BG_EVENT_PATTERN.finditer(bg_section)
 
     for i, match in enumerate(bg_matches):
         x = int(match.group(1))
         y = int(match.group(2))
-        text_id = match.group(3)
+        text_id = match.group(3).decode()
 
         signs.append(
             {
@@ -165,41 +180,34 @@ def get_all_items(cursor):
     return items_by_short_name
 
 
-def parse_object_events(content, map_name, cursor):
-    """Parse object events (NPCs, items) from the map object file"""
-    objects = []
+def parse_object_events(content, map_name, items):
+    """Parse object events (NPCs, items) from the raw bytes of a map object file
 
-    # Get all items from the database
-    items = get_all_items(cursor)
+    items maps item constants to item IDs, as returned by get_all_items.
+    """
+    objects = []
 
     # Find the object events section
-    object_section_match = re.search(
-        r"def_object_events(.*?)(?:def_warps_to|\Z)", content, re.DOTALL
-    )
+    object_section_match = OBJECT_SECTION_PATTERN.search(content)
     if not object_section_match:
         return objects
 
     object_section = object_section_match.group(1)
 
     # Extract individual object events
-    object_pattern = r"object_event\s+(\d+),\s+(\d+),\s+(\w+),\s+(\w+),\s+(\w+),\s+(\w+)(?:,\s+(\w+)(?:,\s+(\w+))?)?"
-    object_matches = re.finditer(object_pattern, object_section)
+    object_matches = OBJECT_EVENT_PATTERN.finditer(object_section)
 
     for i, match in enumerate(object_matches):
         x = int(match.group(1))
         y = int(match.group(2))
-        sprite = match.group(3)
-        action_type = match.group(4)
-        action_direction = match.group(5)
-        text_id = match.group(6)
+        sprite = match.group(3).decode()
+        action_type = match.group(4).decode()
+        action_direction = match.group(5).decode()
+        text_id = match.group(6).decode()
 
         # Check for additional parameters (item or trainer info)
-        item_or_trainer = (
-            match.group(7) if len(match.groups()) >= 7 and match.group(7) else None
-        )
-        trainer_level = (
-            match.group(8) if len(match.groups()) >= 8 and match.group(8) else None
-        )
+        item_or_trainer = match.group(7).decode() if match.group(7) else None
+        trainer_level = match.group(8).decode() if match.group(8) else None
 
         # Determine if this is an item or NPC based on sprite and parameters
         object_type = OBJECT_TYPE_OBJECT
@@ -220,7 +228,7 @@ def parse_object_events(content, map_name, cursor):
         ):
             object_type = OBJECT_TYPE_ITEM
             # Try to extract item ID from sprite name if possible
-            item_match = re.search(r"ITEM_(\d+)", sprite)
+            item_match = ITEM_SPRITE_PATTERN.search(sprite)
             if item_match:
                 item_id = int(item_match.group(1))
 
@@ -244,22 +252,17 @@ def parse_object_events(content, map_name, cursor):
     return objects
 
 
-def process_map_file(file_path, cursor):
-    """Process a single map object file and extract all objects"""
-    map_name = parse_map_name_from_file(file_path)
-
-    # Get map ID for this map
-    map_id = get_map_id_for_map(map_name, cursor)
-    if not map_id:
-        print(f"Warning: Could not find map ID for map {map_name}")
-        return []
+def process_map_file(file_path, map_name, map_id, items):
+    """Process a single map object file and extract all objects
 
-    with open(file_path, "r") as f:
+    Only reads the file and parses it, so it can run on a worker thread.
+    """
+    with open(file_path, "rb") as f:
         content = f.read()
 
     # Parse different types of objects
     signs = parse_bg_events(content, map_name)
-    objects = parse_object_events(content, map_name, cursor)
+    objects = parse_object_events(content, map_name, items)
 
     # Combine all objects and add map_id
     all_objects = signs + objects
@@ -277,29 +280,46 @@ def main():
     map_files = list(POKEMON_DATA_DIR.glob("*.asm"))
     print(f"Found {len(map_files)} map files")
 
-    # Process each map file
-    all_objects = []
+    # Get all items and maps from the database once for every map file
+    items = get_all_items(cursor)
+    maps_by_name = get_all_maps(cursor)
+    maps_by_lower_name = {}
+    for name, map_id in maps_by_name.items():
+        maps_by_lower_name.setdefault(name.lower(), map_id)
+
+    # Get map ID for each map file
+    map_jobs = []
     processed_count = 0
 
     for file_path in map_files:
-        objects = process_map_file(file_path, cursor)
-        all_objects.extend(objects)
+        map_name = parse_map_name_from_file(file_path)
+        map_id = get_map_id_for_map(map_name, maps_by_name, maps_by_lower_name)
         processed_count += 1
+        if not map_id:
+            print(f"Warning: Could not find map ID for map {map_name}")
+            continue
+        map_jobs.append((file_path, map_name, map_id))
 
-    print(f"Processed {processed_count} map files, found {len(all_objects)} objects")
+    # Read and parse the map files in parallel, keeping the file order
+    all_objects = []
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for objects in executor.map(
+            lambda map_job: process_map_file(*map_job, items), map_jobs
+        ):
+            all_objects.extend(objects)
 
-    # Insert objects into database
-    signs_count = 0
-    sprites_count = 0
+    print(f"Processed {processed_count} map files, found {len(all_objects)} objects")
 
-    for obj in all_objects:
-        cursor.execute(
-            """
-        INSERT INTO objects (
-            name, map_id, object_type, x, y, local_x, local_y,
-            spriteset_id, sprite_name, text, action_type, action_direction, item_id
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
+    # Insert objects into database in a single transaction
+    cursor.execute("BEGIN")
+    cursor.executemany(
+        """
+    INSERT INTO objects (
+        name, map_id, object_type, x, y, local_x, local_y,
+        spriteset_id, sprite_name, text, action_type, action_direction, item_id
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+        [
             (
                 obj.get("name"),
                 obj.get("map_id"),
@@ -314,13 +334,13 @@ def main():
                 obj.get("action_type"),
                 obj.get("action_direction"),
                 obj.get("item_id"),
-            ),
-        )
+            )
+            for obj in all_objects
+        ],
+    )
 
-        if obj.get("object_type") == "sign":
-            signs_count += 1
-        else:
-            sprites_count += 1
+    signs_count = sum(1 for obj in all_objects if obj.get("object_type") == "sign")
+    sprites_count = len(all_objects) - signs_count
 
     # Commit changes and close connection
     conn.commit()
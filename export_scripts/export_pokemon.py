@@ -2,12 +2,15 @@ import os
 import re
 import sqlite3
 import glob
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 import sys
 
 # Add the root directory to the Python path to allow imports from utils
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from utils.pokemon_utils import SPECIAL_NAME_MAPPINGS, normalize_pokemon_name
+from config import tune_bulk_load
 
 # Constants
 # Get the project root directory (parent of the script's directory)
@@ -32,7 +35,62 @@ EVOS_PATTERN = re.compile(
 EVOLVE_LEVEL_PATTERN = re.compile(r"\s*db EVOLVE_LEVEL, (\d+), (\w+)")
 EVOLVE_ITEM_PATTERN = re.compile(r"\s*db EVOLVE_ITEM, [^,]+, \d+, (\w+)")
 EVOLVE_TRADE_PATTERN = re.compile(r"\s*db EVOLVE_TRADE, \d+, (\w+)")
-CRY_PATTERN = re.compile(r"\s*mon_cry [^,]+, \$([0-9A-F]+), \$([0-9A-F]+) ; (.+)$")
+CRY_PATTERN = re.compile(
+    r"mon_cry [^,\n]+, \$([0-9A-F]+), \$([0-9A-F]+) ; (.+)$", re.MULTILINE
+)
+DEX_CONSTANT_PATTERN = re.compile(r"const DEX_(\w+)[ \t]*; (\d+)")
+BASE_DEX_ID_PATTERN = re.compile(r"db DEX_(\w+)")
+BASE_STATS_PATTERN = re.compile(r"db\s+(\d+),\s+(\d+),\s+(\d+),\s+(\d+),\s+(\d+)")
+BASE_TYPES_PATTERN = re.compile(r"db (\w+), (\w+) ; type")
+CATCH_RATE_PATTERN = re.compile(r"db (\d+) ; catch rate")
+BASE_EXP_PATTERN = re.compile(r"db (\d+) ; base exp")
+LEVEL_1_MOVES_PATTERN = re.compile(
+    r"db ([^,\s]+), ([^,\s]+), ([^,\s]+), ([^,\s]+) ; level 1 learnset"
+)
+DEX_ENTRY_POINTER_PATTERN = re.compile(r"\s*dw (\w+)DexEntry")
+DEX_TEXT_ENTRY_PATTERN = re.compile(r"_(\w+)DexEntry::([\s\S]*?)dex")
+DEX_TEXT_PARTS_PATTERN = re.compile(r'(?:text|next|page) "([^"]+)"')
+EVOS_MOVES_POINTER_PATTERN = re.compile(r"\s*dw (\w+)EvosMoves")
+MENU_ICON_PATTERN = re.compile(r"nybble (ICON_\w+)")
+PALETTE_PATTERN = re.compile(r"db (PAL_\w+)")
+
+# pokemon columns in insert order; iter_pokemon_rows yields tuples in this order
+POKEMON_COLUMNS = (
+    "id",
+    "name",
+    "hp",
+    "atk",
+    "def",
+    "spd",
+    "spc",
+    "type_1",
+    "type_2",
+    "catch_rate",
+    "base_exp",
+    "default_move_1_id",
+    "default_move_2_id",
+    "default_move_3_id",
+    "default_move_4_id",
+    "base_cry",
+    "cry_pitch",
+    "cry_length",
+    "pokedex_type",
+    "height",
+    "weight",
+    "pokedex_text",
+    "evolve_level",
+    "evolve_pokemon",
+    "evolves_from_trade",
+    "icon_image",
+    "palette_type",
+)
+INSERT_POKEMON_SQL = (
+    f"INSERT INTO pokemon ({', '.join(POKEMON_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(POKEMON_COLUMNS))})"
+)
+
+# Shared stand-in for Pokémon missing from an extractor's results; never mutated
+EMPTY_ENTRY = {}
 
 # Special character name mappings - Removed and imported from utils.pokemon_utils
 
@@ -42,6 +100,8 @@ def create_database():
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
+    tune_bulk_load(conn)
+
     # Drop existing pokemon table if it exists
     cursor.execute("DROP TABLE IF EXISTS pokemon")
 
@@ -84,103 +144,118 @@ def create_database():
     return conn, cursor
 
 
+@lru_cache(maxsize=1)
+def read_pokedex_constants():
+    """Read the (name, Pokédex number) pairs from the constants file once, in order."""
+    with open(POKEDEX_CONSTANTS_FILE, "r") as f:
+        content = f.read()
+
+    return tuple(
+        (match.group(1), int(match.group(2)))
+        for match in DEX_CONSTANT_PATTERN.finditer(content)
+    )
+
+
+def skip_header_lines(content, count):
+    """Return the offset just past the first count lines of content."""
+    offset = 0
+    for _ in range(count):
+        newline = content.find("\n", offset)
+        if newline == -1:
+            return len(content)
+        offset = newline + 1
+    return offset
+
+
 def load_pokedex_constants():
     """Load Pokémon names and their Pokédex numbers from the constants file."""
     pokemon_dex = {}
     dex_to_name = {}
 
-    with open(POKEDEX_CONSTANTS_FILE, "r") as f:
-        for line in f:
-            match = re.search(r"const DEX_(\w+)\s*; (\d+)", line)
-            if match:
-                name = match.group(1)
-                dex_num = int(match.group(2))
-                pokemon_dex[name] = dex_num
-                dex_to_name[dex_num] = name
+    for name, dex_num in read_pokedex_constants():
+        pokemon_dex[name] = dex_num
+        dex_to_name[dex_num] = name
 
     return pokemon_dex, dex_to_name
 
 
+def parse_base_stats_file(stats_file):
+    """Parse one base stats file into (dex_id, stats), or None if incomplete."""
+    with open(stats_file, "r") as f:
+        content = f.read()
+
+    # Extract Pokédex ID
+    dex_id_match = BASE_DEX_ID_PATTERN.search(content)
+    if dex_id_match:
+        dex_id = dex_id_match.group(1)
+        normalized_dex_id = normalize_pokemon_name(dex_id)
+    else:
+        return None
+
+    # Extract base stats
+    stats_match = BASE_STATS_PATTERN.search(content)
+    if stats_match:
+        hp, atk, def_, spd, spc = map(int, stats_match.groups())
+    else:
+        return None
+
+    # Extract types
+    types_match = BASE_TYPES_PATTERN.search(content)
+    if types_match:
+        type_1, type_2 = types_match.groups()
+        # Fix for PSYCHIC_TYPE -> PSYCHIC
+        if type_1 == "PSYCHIC_TYPE":
+            type_1 = "PSYCHIC"
+        if type_2 == "PSYCHIC_TYPE":
+            type_2 = "PSYCHIC"
+    else:
+        return None
+
+    # Extract catch rate and base exp
+    catch_rate_match = CATCH_RATE_PATTERN.search(content)
+    base_exp_match = BASE_EXP_PATTERN.search(content)
+
+    catch_rate = int(catch_rate_match.group(1)) if catch_rate_match else 0
+    base_exp = int(base_exp_match.group(1)) if base_exp_match else 0
+
+    # Extract default moves
+    moves_match = LEVEL_1_MOVES_PATTERN.search(content)
+    if moves_match:
+        move_1, move_2, move_3, move_4 = moves_match.groups()
+    else:
+        move_1, move_2, move_3, move_4 = (
+            "NO_MOVE",
+            "NO_MOVE",
+            "NO_MOVE",
+            "NO_MOVE",
+        )
+
+    return normalized_dex_id, {
+        "name": normalized_dex_id,
+        "hp": hp,
+        "atk": atk,
+        "def": def_,
+        "spd": spd,
+        "spc": spc,
+        "type_1": type_1,
+        "type_2": type_2,
+        "catch_rate": catch_rate,
+        "base_exp": base_exp,
+        "default_move_1_id": move_1,
+        "default_move_2_id": move_2,
+        "default_move_3_id": move_3,
+        "default_move_4_id": move_4,
+    }
+
+
 def extract_base_stats():
     """Extract base stats from all Pokémon base stats files."""
-    pokemon_stats = {}
-
-    for stats_file in glob.glob(f"{BASE_STATS_DIR}/*.asm"):
-        pokemon_name = os.path.basename(stats_file).replace(".asm", "")
-        normalized_name = normalize_pokemon_name(pokemon_name)
-
-        with open(stats_file, "r") as f:
-            content = f.read()
-
-            # Extract Pokédex ID
-            dex_id_match = re.search(r"db DEX_(\w+)", content)
-            if dex_id_match:
-                dex_id = dex_id_match.group(1)
-                normalized_dex_id = normalize_pokemon_name(dex_id)
-            else:
-                continue
-
-            # Extract base stats
-            stats_match = re.search(
-                r"db\s+(\d+),\s+(\d+),\s+(\d+),\s+(\d+),\s+(\d+)", content
-            )
-            if stats_match:
-                hp, atk, def_, spd, spc = map(int, stats_match.groups())
-            else:
-                continue
-
-            # Extract types
-            types_match = re.search(r"db (\w+), (\w+) ; type", content)
-            if types_match:
-                type_1, type_2 = types_match.groups()
-                # Fix for PSYCHIC_TYPE -> PSYCHIC
-                if type_1 == "PSYCHIC_TYPE":
-                    type_1 = "PSYCHIC"
-                if type_2 == "PSYCHIC_TYPE":
-                    type_2 = "PSYCHIC"
-            else:
-                continue
-
-            # Extract catch rate and base exp
-            catch_rate_match = re.search(r"db (\d+) ; catch rate", content)
-            base_exp_match = re.search(r"db (\d+) ; base exp", content)
-
-            catch_rate = int(catch_rate_match.group(1)) if catch_rate_match else 0
-            base_exp = int(base_exp_match.group(1)) if base_exp_match else 0
-
-            # Extract default moves
-            moves_match = re.search(
-                r"db ([^,\s]+), ([^,\s]+), ([^,\s]+), ([^,\s]+) ; level 1 learnset",
-                content,
-            )
-            if moves_match:
-                move_1, move_2, move_3, move_4 = moves_match.groups()
-            else:
-                move_1, move_2, move_3, move_4 = (
-                    "NO_MOVE",
-                    "NO_MOVE",
-                    "NO_MOVE",
-                    "NO_MOVE",
-                )
-
-            pokemon_stats[normalized_dex_id] = {
-                "name": normalized_dex_id,
-                "hp": hp,
-                "atk": atk,
-                "def": def_,
-                "spd": spd,
-                "spc": spc,
-                "type_1": type_1,
-                "type_2": type_2,
-                "catch_rate": catch_rate,
-                "base_exp": base_exp,
-                "default_move_1_id": move_1,
-                "default_move_2_id": move_2,
-                "default_move_3_id": move_3,
-                "default_move_4_id": move_4,
-            }
-
-    return pokemon_stats
+    # Files are independent, so overlap their reads; map() keeps glob order
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = executor.map(
+            parse_base_stats_file, glob.glob(f"{BASE_STATS_DIR}/*.asm")
+        )
+        return dict(result for result in results if result is not None)
 
 
 def extract_cries():
@@ -188,22 +263,18 @@ def extract_cries():
     cries = {}
 
     with open(f"{POKEMON_DATA_DIR}/cries.asm", "r") as f:
-        lines = f.readlines()
-
-        # Process each line
-        for line in lines:
-            if "mon_cry" in line:
-                match = CRY_PATTERN.search(line)
-                if match:
-                    pitch, length, name = match.groups()
-                    name = name.strip()  # Strip any whitespace
-                    normalized_name = normalize_pokemon_name(name)
-
-                    cries[normalized_name] = {
-                        "base_cry": 0,  # Using 0 as a placeholder
-                        "cry_pitch": int(pitch, 16),
-                        "cry_length": int(length, 16),
-                    }
+        content = f.read()
+
+    for match in CRY_PATTERN.finditer(content):
+        pitch, length, name = match.groups()
+        name = name.strip()  # Strip any whitespace
+        normalized_name = normalize_pokemon_name(name)
+
+        cries[normalized_name] = {
+            "base_cry": 0,  # Using 0 as a placeholder
+            "cry_pitch": int(pitch, 16),
+            "cry_length": int(length, 16),
+        }
 
     return cries
 
@@ -218,7 +289,7 @@ def extract_dex_entries():
         # First, create a mapping from Pokémon name to its dex entry name
         name_to_dex_entry = {}
         for line in content.split("\n"):
-            match = re.search(r"\s*dw (\w+)DexEntry", line)
+            match = DEX_ENTRY_POINTER_PATTERN.search(line)
             if match:
                 dex_entry_name = match.group(1)
                 normalized_name = normalize_pokemon_name(dex_entry_name)
@@ -246,24 +317,13 @@ def extract_dex_text():
         content = f.read()
 
         # Extract all Pokédex entries
-        for entry_match in re.finditer(r"_(\w+)DexEntry::([\s\S]*?)dex", content):
+        for entry_match in DEX_TEXT_ENTRY_PATTERN.finditer(content):
             pokemon_name = entry_match.group(1)
             normalized_name = normalize_pokemon_name(pokemon_name)
             entry_text = entry_match.group(2)
 
-            # Extract all text and next lines
-            text_parts = []
-            for line in entry_text.split("\n"):
-                text_match = re.search(r'text "([^"]+)"', line)
-                next_match = re.search(r'next "([^"]+)"', line)
-                page_match = re.search(r'page "([^"]+)"', line)
-
-                if text_match:
-                    text_parts.append(text_match.group(1))
-                elif next_match:
-                    text_parts.append(next_match.group(1))
-                elif page_match:
-                    text_parts.append(page_match.group(1))
+            # Extract all text, next and page lines
+            text_parts = DEX_TEXT_PARTS_PATTERN.findall(entry_text)
 
             # Join all text parts with spaces
             dex_text[normalized_name] = " ".join(text_parts)
@@ -281,26 +341,19 @@ def extract_evolutions():
         # First, create a mapping from Pokémon name to its evo_moves entry name
         name_to_evo_entry = {}
         for line in content.split("\n"):
-            match = re.search(r"\s*dw (\w+)EvosMoves", line)
+            match = EVOS_MOVES_POINTER_PATTERN.search(line)
             if match:
                 evo_entry_name = match.group(1)
                 normalized_name = normalize_pokemon_name(evo_entry_name)
                 name_to_evo_entry[normalized_name] = evo_entry_name
 
         # Now extract the evolution data
-        for match in re.finditer(r"(\w+)EvosMoves:\s*\n; Evolutions", content):
+        for match in EVOS_PATTERN.finditer(content):
             pokemon_name = match.group(1)
             normalized_name = normalize_pokemon_name(pokemon_name)
 
-            # Find the start of the evolution block
-            start_pos = match.end()
-
-            # Extract the evolution block until 'db 0'
-            evo_block = ""
-            for line in content[start_pos:].split("\n"):
-                evo_block += line + "\n"
-                if line.strip() == "db 0":
-                    break
+            # The evolution block is everything up to 'db 0'
+            evo_block = match.group(2)
 
             evolve_level = None
             evolve_pokemon = None
@@ -335,28 +388,17 @@ def extract_evolutions():
 def extract_menu_icons():
     """Extract menu icons from menu_icons.asm."""
     icons = {}
-    pokemon_names = []
 
     # First, get the list of Pokémon names in order
-    with open(POKEDEX_CONSTANTS_FILE, "r") as f:
-        for line in f:
-            match = re.search(r"const DEX_(\w+)\s*; (\d+)", line)
-            if match:
-                pokemon_names.append(match.group(1))
+    pokemon_names = [name for name, _ in read_pokedex_constants()]
 
     with open(f"{POKEMON_DATA_DIR}/menu_icons.asm", "r") as f:
-        lines = f.readlines()
-
-        # Skip the first few lines of header
-        pokemon_index = 0
-        for line in lines[3:]:  # Skip the first 3 lines
-            if "nybble ICON_" in line:
-                icon_match = re.search(r"nybble (ICON_\w+)", line)
-                if icon_match and pokemon_index < len(pokemon_names):
-                    icon = icon_match.group(1)
-                    pokemon_name = normalize_pokemon_name(pokemon_names[pokemon_index])
-                    icons[pokemon_name] = icon
-                    pokemon_index += 1
+        content = f.read()
+
+    # Skip the first 3 lines of header, then pair icons with names in order
+    icon_matches = MENU_ICON_PATTERN.finditer(content, skip_header_lines(content, 3))
+    for icon_match, pokemon_name in zip(icon_matches, pokemon_names):
+        icons[normalize_pokemon_name(pokemon_name)] = icon_match.group(1)
 
     return icons
 
@@ -364,32 +406,71 @@ def extract_menu_icons():
 def extract_palettes():
     """Extract palette types from palettes.asm."""
     palettes = {}
-    pokemon_names = []
 
     # First, get the list of Pokémon names in order
-    with open(POKEDEX_CONSTANTS_FILE, "r") as f:
-        for line in f:
-            match = re.search(r"const DEX_(\w+)\s*; (\d+)", line)
-            if match:
-                pokemon_names.append(match.group(1))
+    pokemon_names = [name for name, _ in read_pokedex_constants()]
 
     with open(f"{POKEMON_DATA_DIR}/palettes.asm", "r") as f:
-        lines = f.readlines()
-
-        # Skip the first few lines of header
-        pokemon_index = 0
-        for line in lines[2:]:  # Skip the first 2 lines
-            if "db PAL_" in line:
-                palette_match = re.search(r"db (PAL_\w+)", line)
-                if palette_match and pokemon_index < len(pokemon_names):
-                    palette = palette_match.group(1)
-                    pokemon_name = normalize_pokemon_name(pokemon_names[pokemon_index])
-                    palettes[pokemon_name] = palette
-                    pokemon_index += 1
+        content = f.read()
+
+    # Skip the first 2 lines of header, then pair palettes with names in order
+    palette_matches = PALETTE_PATTERN.finditer(content, skip_header_lines(content, 2))
+    for palette_match, pokemon_name in zip(palette_matches, pokemon_names):
+        palettes[normalize_pokemon_name(pokemon_name)] = palette_match.group(1)
 
     return palettes
 
 
+def iter_pokemon_rows(
+    pokemon_dex,
+    base_stats,
+    cries,
+    dex_entries,
+    dex_text,
+    evolutions,
+    menu_icons,
+    palettes,
+):
+    """Yield a pokemon row, ordered as POKEMON_COLUMNS, for each Pokémon with base stats."""
+    for name, dex_num in pokemon_dex.items():
+        if name not in base_stats:
+            continue
+
+        stats = base_stats[name]
+        cry = cries.get(name, EMPTY_ENTRY)
+        dex_entry = dex_entries.get(name, EMPTY_ENTRY)
+        evolution = evolutions.get(name, EMPTY_ENTRY)
+        yield (
+            dex_num,
+            name,
+            stats["hp"],
+            stats["atk"],
+            stats["def"],
+            stats["spd"],
+            stats["spc"],
+            stats["type_1"],
+            stats["type_2"],
+            stats["catch_rate"],
+            stats["base_exp"],
+            stats["default_move_1_id"],
+            stats["default_move_2_id"],
+            stats["default_move_3_id"],
+            stats["default_move_4_id"],
+            cry.get("base_cry"),
+            cry.get("cry_pitch"),
+            cry.get("cry_length"),
+            dex_entry.get("pokedex_type"),
+            dex_entry.get("height"),
+            dex_entry.get("weight"),
+            dex_text.get(name),
+            evolution.get("evolve_level"),
+            evolution.get("evolve_pokemon"),
+            1 if evolution.get("evolves_from_trade") else 0,
+            menu_icons.get(name),
+            palettes.get(name),
+        )
+
+
 def main():
     # Create database
     conn, cursor = create_database()
@@ -397,68 +478,42 @@ def main():
     # Load Pokédex constants
     pokemon_dex, dex_to_name = load_pokedex_constants()
 
-    # Extract data from various files
-    base_stats = extract_base_stats()
-    cries = extract_cries()
-    dex_entries = extract_dex_entries()
-    dex_text = extract_dex_text()
-    evolutions = extract_evolutions()
-    menu_icons = extract_menu_icons()
-    palettes = extract_palettes()
-
-    # Insert data into database
-    for name, dex_num in pokemon_dex.items():
-        if name in base_stats:
-            # Prepare data for insertion
-            pokemon_data = {
-                "id": dex_num,
-                "name": name,
-                "hp": base_stats[name]["hp"],
-                "atk": base_stats[name]["atk"],
-                "def": base_stats[name]["def"],
-                "spd": base_stats[name]["spd"],
-                "spc": base_stats[name]["spc"],
-                "type_1": base_stats[name]["type_1"],
-                "type_2": base_stats[name]["type_2"],
-                "catch_rate": base_stats[name]["catch_rate"],
-                "base_exp": base_stats[name]["base_exp"],
-                "default_move_1_id": base_stats[name]["default_move_1_id"],
-                "default_move_2_id": base_stats[name]["default_move_2_id"],
-                "default_move_3_id": base_stats[name]["default_move_3_id"],
-                "default_move_4_id": base_stats[name]["default_move_4_id"],
-                "base_cry": cries.get(name, {}).get("base_cry"),
-                "cry_pitch": cries.get(name, {}).get("cry_pitch"),
-                "cry_length": cries.get(name, {}).get("cry_length"),
-                "pokedex_type": dex_entries.get(name, {}).get("pokedex_type"),
-                "height": dex_entries.get(name, {}).get("height"),
-                "weight": dex_entries.get(name, {}).get("weight"),
-                "pokedex_text": dex_text.get(name),
-                "evolve_level": evolutions.get(name, {}).get("evolve_level"),
-                "evolve_pokemon": evolutions.get(name, {}).get("evolve_pokemon"),
-                "evolves_from_trade": (
-                    1 if evolutions.get(name, {}).get("evolves_from_trade") else 0
-                ),
-                "icon_image": menu_icons.get(name),
-                "palette_type": palettes.get(name),
-            }
-
-            # Insert into database
-            cursor.execute(
-                """
-            INSERT INTO pokemon (
-                id, name, hp, atk, def, spd, spc, type_1, type_2, catch_rate, base_exp,
-                default_move_1_id, default_move_2_id, default_move_3_id, default_move_4_id,
-                base_cry, cry_pitch, cry_length, pokedex_type, height, weight, pokedex_text,
-                evolve_level, evolve_pokemon, evolves_from_trade, icon_image, palette_type
-            ) VALUES (
-                :id, :name, :hp, :atk, :def, :spd, :spc, :type_1, :type_2, :catch_rate, :base_exp,
-                :default_move_1_id, :default_move_2_id, :default_move_3_id, :default_move_4_id,
-                :base_cry, :cry_pitch, :cry_length, :pokedex_type, :height, :weight, :pokedex_text,
-                :evolve_level, :evolve_pokemon, :evolves_from_trade, :icon_image, :palette_type
-            )
-            """,
-                pokemon_data,
-            )
+    # Extract data from various files; each extractor reads its own file(s)
+    # and shares no state, so run them side by side
+    extractors = {
+        "base_stats": extract_base_stats,
+        "cries": extract_cries,
+        "dex_entries": extract_dex_entries,
+        "dex_text": extract_dex_text,
+        "evolutions": extract_evolutions,
+        "menu_icons": extract_menu_icons,
+        "palettes": extract_palettes,
+    }
+    with ThreadPoolExecutor(max_workers=len(extractors)) as executor:
+        futures = {key: executor.submit(fn) for key, fn in extractors.items()}
+    base_stats = futures["base_stats"].result()
+    cries = futures["cries"].result()
+    dex_entries = futures["dex_entries"].result()
+    dex_text = futures["dex_text"].result()
+    evolutions = futures["evolutions"].result()
+    menu_icons = futures["menu_icons"].result()
+    palettes = futures["palettes"].result()
+
+    # Insert into database in a single transaction
+    cursor.execute("BEGIN")
+    cursor.executemany(
+        INSERT_POKEMON_SQL,
+        iter_pokemon_rows(
+            pokemon_dex,
+            base_stats,
+            cries,
+            dex_entries,
+            dex_text,
+            evolutions,
+            menu_icons,
+            palettes,
+        ),
+    )
 
     # Commit changes and close connection
     conn.commit()
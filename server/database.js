@@ -48,14 +48,18 @@ class Database {
   }
 
   // Tile-related queries
+  // Tile image N is stored as tile_images/tile_{N - 1}.png
   getTileImages() {
-    return this.all("SELECT id, image_path FROM tile_images");
+    return this.all(
+      "SELECT id, 'tile_images/tile_' || (id - 1) || '.png' AS image_path FROM tile_images"
+    );
   }
 
   getTileImageById(tileId) {
-    return this.get("SELECT image_path FROM tile_images WHERE id = ?", [
-      tileId,
-    ]);
+    return this.get(
+      "SELECT 'tile_images/tile_' || (id - 1) || '.png' AS image_path FROM tile_images WHERE id = ?",
+      [tileId]
+    );
   }
 
   getTilesByMapId(mapId) {